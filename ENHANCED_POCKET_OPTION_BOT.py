@@ -34,6 +34,11 @@ if not TELEGRAM_BOT_TOKEN:
     print("Please create a .env file with your bot token.")
     exit(1)
 
+# Telegram HTTP pool: handlers share one keep-alive pool; wait up to
+# POOL_TIMEOUT seconds for a free connection instead of PTB's 1s default
+TELEGRAM_POOL_SIZE = 256
+TELEGRAM_POOL_TIMEOUT = 20.0
+
 class EnhancedPocketOptionBot:
     def __init__(self, token: str):
         self.token = token
@@ -889,9 +894,19 @@ Select an option to continue:
         
         await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='Markdown')
     
+    def build_application(self):
+        """Create the Telegram application with the production HTTP pool settings"""
+        return (
+            Application.builder()
+            .token(self.token)
+            .connection_pool_size(TELEGRAM_POOL_SIZE)
+            .pool_timeout(TELEGRAM_POOL_TIMEOUT)
+            .build()
+        )
+    
     def run(self):
         """Start the bot"""
-        self.application = Application.builder().token(self.token).build()
+        self.application = self.build_application()
         self.application.add_handler(CommandHandler("start", self.start_command))
         self.application.add_handler(CallbackQueryHandler(self.button_callback))
         
@@ -19,7 +19,7 @@ def print_quick_start():
    • Save the bot token
 
 2️⃣ INSTALL REQUIREMENTS
-   • Make sure you have Python 3.8+
+   • Make sure you have Python 3.10+
    • Run: pip install -r requirements.txt
 
 3️⃣ CONFIGURE ENVIRONMENT
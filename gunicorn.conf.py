@@ -0,0 +1,11 @@
+"""
+Gunicorn settings for the CoinPayments webhook server
+Run with: gunicorn webhook_server:app
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+keepalive = 30
@@ -6,21 +6,17 @@ Main bot implementation with comprehensive trading analysis features
 import os
 import logging
 import asyncio
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import json
-import pandas as pd
+import sqlite3
 from dotenv import load_dotenv
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, ContextTypes, filters
+from telegram.ext import AIORateLimiter, Application, CommandHandler, CallbackQueryHandler, MessageHandler, ContextTypes, filters
 from telegram.constants import ParseMode
 
-# Import custom modules
-from technical_analysis import TechnicalAnalyzer
-from risk_management import RiskManager
-from market_news import MarketNews
-from portfolio_tracker import PortfolioTracker
-
 # Load environment variables
 load_dotenv()
 
@@ -35,6 +31,39 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Users with no activity for this long are dropped from user_preferences
+USER_INACTIVITY_TTL = 30 * 24 * 3600
+
+# Seconds a fetched news result is reused before hitting the news APIs again
+NEWS_CACHE_TTL = 60
+
+# Maximum number of broadcast messages in flight at once
+BROADCAST_CONCURRENCY = 25
+
+# Candle length per timeframe, used to reuse a signal until its bar closes
+TIMEFRAME_SECONDS = {
+    '1m': 60,
+    '5m': 5 * 60,
+    '15m': 15 * 60,
+    '30m': 30 * 60,
+    '1h': 3600,
+    '4h': 4 * 3600,
+    '1d': 24 * 3600
+}
+
+class LRUCache(OrderedDict):
+    """Dict with a size cap that evicts the least recently written entries"""
+    
+    def __init__(self, capacity: int):
+        super().__init__()
+        self.capacity = capacity
+    
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.capacity:
+            self.popitem(last=False)
+
 class PocketOptionBot:
     """Main bot class for Pocket Option trading analysis"""
     
@@ -51,19 +80,55 @@ class PocketOptionBot:
             'ACCOUNT_BALANCE': float(os.getenv('ACCOUNT_BALANCE', 1000))
         }
         
-        # Initialize components
+        # Initialize components (imported here so the pandas/ta stack only
+        # loads when a bot is actually created)
+        from technical_analysis import TechnicalAnalyzer
+        from risk_management import RiskManager
+        from market_news import MarketNews
+        from portfolio_tracker import PortfolioTracker
+        
         self.technical_analyzer = TechnicalAnalyzer()
         self.risk_manager = RiskManager(self.config)
         self.market_news = MarketNews()
         self.portfolio_tracker = PortfolioTracker()
         
         # Bot state
-        self.user_preferences = {}
-        self.analysis_cache = {}
-        self.last_analysis_time = {}
+        self.init_database()
+        self.user_preferences = self.load_user_preferences()
+        self._active_subscriptions = sum(1 for prefs in self.user_preferences.values() if prefs.get('notifications', False))
+        self.analysis_cache = LRUCache(512)
+        self.last_analysis_time = LRUCache(512)
+        self._news_cache = (0, None)  # (fetched_at, news_data)
+        self._timeframe_signal_cache = LRUCache(512)  # (symbol, tf) -> (bar index, signal)
+        
+        # Inline keyboard callback dispatch tables
+        self._callback_handlers = {
+            "quick_analyze": self.analyze_command,
+            "quick_signal": self.signal_command,
+            "quick_portfolio": self.portfolio_command,
+            "quick_news": self.news_command,
+            "refresh_analysis": self.analyze_command,
+            "save_trade": self.save_trade_from_signal,
+            "change_symbol": self.change_symbol_handler,
+            "change_risk": self.change_risk_handler,
+            "toggle_notifications": self.toggle_notifications,
+            "toggle_auto": self.toggle_auto_analysis,
+            "save_settings": self.save_settings_handler
+        }
+        self._callback_action_handlers = {
+            "analyze": self.analyze_command,
+            "signal": self.signal_command
+        }
         
-        # Create bot application
-        self.application = Application.builder().token(self.config['TELEGRAM_BOT_TOKEN']).build()
+        # Create bot application; the rate limiter keeps outgoing messages under
+        # Telegram's 30 msg/s flood limit and retries on RetryAfter
+        self.application = (
+            Application.builder()
+            .token(self.config['TELEGRAM_BOT_TOKEN'])
+            .rate_limiter(AIORateLimiter(overall_max_rate=30, overall_time_period=1, max_retries=3))
+            .concurrent_updates(True)
+            .build()
+        )
         self.setup_handlers()
     
     def setup_handlers(self):
@@ -205,7 +270,7 @@ Need more help? Contact support or check the documentation.
             await update.message.reply_text(analysis_text, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN, disable_web_page_preview=True)
             
         except Exception as e:
-            logger.error(f"Error in analyze command: {e}")
+            logger.error("Error in analyze command: %s", e)
             await update.message.reply_text(f"❌ Error generating analysis: {str(e)}")
     
     async def signal_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -238,7 +303,7 @@ Need more help? Contact support or check the documentation.
             await update.message.reply_text(signal_text, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
             
         except Exception as e:
-            logger.error(f"Error in signal command: {e}")
+            logger.error("Error in signal command: %s", e)
             await update.message.reply_text(f"❌ Error generating signal: {str(e)}")
     
     async def timeframes_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -292,7 +357,7 @@ Need more help? Contact support or check the documentation.
         await update.message.reply_text("📰 Fetching latest market news... Please wait.")
         
         try:
-            news_data = self.market_news.get_latest_news()
+            news_data = await self.get_cached_news()
             news_text = self.format_news_message(news_data)
             keyboard = [
                 [InlineKeyboardButton("🔄 Refresh News", callback_data="refresh_news")],
@@ -351,7 +416,7 @@ Current Settings:
 **Daily Summary:**
 • Signals Sent: {daily_summary['signals_sent']}/{self.config['MAX_DAILY_SIGNALS']}
 • Trades Taken: {daily_summary['trades_taken']}
-• Profit/Loss: ${daily_summary['profit_loss']}
+• Profit/Loss: ${daily_summary['profit_loss']:.2f}
 • Remaining Signals: {daily_summary['remaining_signals']}
 
 **Risk Assessment:**
@@ -393,7 +458,7 @@ Current Settings:
 
 **User Statistics:**
 • Authorized Users: {len(self.config['AUTHORIZED_USERS'])}
-• Active Subscriptions: {len([u for u in self.user_preferences.values() if u.get('notifications', False)])}
+• Active Subscriptions: {self._active_subscriptions}
         """
         
         await update.message.reply_text(status_text, parse_mode=ParseMode.MARKDOWN)
@@ -403,8 +468,7 @@ Current Settings:
         user_id = update.effective_user.id
         
         if user_id in self.config['AUTHORIZED_USERS'] or not self.config['AUTHORIZED_USERS']:
-            self.user_preferences[user_id] = self.user_preferences.get(user_id, {})
-            self.user_preferences[user_id]['notifications'] = True
+            self.set_notifications(user_id, True)
             
             await update.message.reply_text(
                 "✅ Successfully subscribed to trading signals and alerts!\n\n"
@@ -422,7 +486,7 @@ Current Settings:
         user_id = update.effective_user.id
         
         if user_id in self.user_preferences:
-            self.user_preferences[user_id]['notifications'] = False
+            self.set_notifications(user_id, False)
             await update.message.reply_text("❌ Successfully unsubscribed from notifications.")
         else:
             await update.message.reply_text("ℹ️ You were not subscribed to notifications.")
@@ -434,36 +498,16 @@ Current Settings:
         
         data = query.data
         
-        if data == "quick_analyze":
-            await self.analyze_command(update, context)
-        elif data == "quick_signal":
-            await self.signal_command(update, context)
-        elif data == "quick_portfolio":
-            await self.portfolio_command(update, context)
-        elif data == "quick_news":
-            await self.news_command(update, context)
-        elif data.startswith("analyze_"):
-            symbol = data.replace("analyze_", "")
-            context.args = [symbol]
-            await self.analyze_command(update, context)
-        elif data.startswith("signal_"):
-            symbol = data.replace("signal_", "")
-            context.args = [symbol]
-            await self.signal_command(update, context)
-        elif data == "refresh_analysis":
-            await self.analyze_command(update, context)
-        elif data == "save_trade":
-            await self.save_trade_from_signal(update, context)
-        elif data == "change_symbol":
-            await self.change_symbol_handler(update, context)
-        elif data == "change_risk":
-            await self.change_risk_handler(update, context)
-        elif data == "toggle_notifications":
-            await self.toggle_notifications(update, context)
-        elif data == "toggle_auto":
-            await self.toggle_auto_analysis(update, context)
-        elif data == "save_settings":
-            await self.save_settings_handler(update, context)
+        handler = self._callback_handlers.get(data)
+        if handler:
+            await handler(update, context)
+            return
+        
+        action, _, arg = data.partition("_")
+        handler = self._callback_action_handlers.get(action)
+        if handler:
+            context.args = [arg] if arg else []
+            await handler(update, context)
     
     async def handle_text(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle text messages"""
@@ -502,6 +546,71 @@ Current Settings:
         
         return symbol_mappings.get(symbol, symbol)
     
+    def init_database(self):
+        """Initialize SQLite database for persistent bot state"""
+        self.db = sqlite3.connect(os.getenv('BOT_STATE_DB', 'bot_state.db'), check_same_thread=False, isolation_level=None)
+        self.db.executescript('''
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS user_preferences (
+                telegram_id INTEGER PRIMARY KEY,
+                preferences TEXT NOT NULL
+            );
+        ''')
+    
+    def load_user_preferences(self) -> Dict:
+        """Load all stored user preferences into memory"""
+        rows = self.db.execute('SELECT telegram_id, preferences FROM user_preferences').fetchall()
+        return {telegram_id: json.loads(preferences) for telegram_id, preferences in rows}
+    
+    def save_user_preferences(self, user_id: int):
+        """Write a user's preferences through to the database"""
+        self.db.execute('''
+            INSERT OR REPLACE INTO user_preferences (telegram_id, preferences)
+            VALUES (?, ?)
+        ''', (user_id, json.dumps(self.user_preferences[user_id])))
+    
+    def get_user_preferences(self, user_id: int) -> Dict:
+        """Get (or create) a user's preferences and mark the user as active"""
+        prefs = self.user_preferences.setdefault(user_id, {})
+        prefs['last_seen'] = time.time()
+        return prefs
+    
+    def set_notifications(self, user_id: int, enabled: bool):
+        """Set a user's notification flag and keep the subscription count in sync"""
+        prefs = self.get_user_preferences(user_id)
+        was_enabled = prefs.get('notifications', False)
+        if enabled and not was_enabled:
+            self._active_subscriptions += 1
+        elif was_enabled and not enabled:
+            self._active_subscriptions -= 1
+        prefs['notifications'] = enabled
+        self.save_user_preferences(user_id)
+    
+    def prune_inactive_users(self):
+        """Drop preferences of unsubscribed users inactive for longer than USER_INACTIVITY_TTL"""
+        cutoff = time.time() - USER_INACTIVITY_TTL
+        # Subscribers are kept regardless of last_seen: they get the daily summary
+        # without ever sending a command
+        stale = [
+            uid for uid, prefs in self.user_preferences.items()
+            if not prefs.get('notifications', False) and prefs.get('last_seen', 0) < cutoff
+        ]
+        for uid in stale:
+            del self.user_preferences[uid]
+        self.db.executemany('DELETE FROM user_preferences WHERE telegram_id = ?', [(uid,) for uid in stale])
+        if stale:
+            logger.info("Pruned %d inactive users from preferences", len(stale))
+    
+    async def get_cached_news(self) -> Dict:
+        """Get latest news, fetching at most once per NEWS_CACHE_TTL"""
+        fetched_at, news_data = self._news_cache
+        now = time.monotonic()
+        if news_data is None or now - fetched_at >= NEWS_CACHE_TTL:
+            news_data = await self.market_news.aget_latest_news()
+            self._news_cache = (now, news_data)
+        return news_data
+    
     def get_last_analysis_time(self) -> str:
         """Get timestamp of last analysis"""
         # This would be implemented based on actual analysis history
@@ -519,11 +628,11 @@ Current Settings:
         # Analyze multiple timeframes
         for tf in timeframes:
             try:
-                signal = self.technical_analyzer.generate_signal(symbol, tf)
+                signal = self.get_timeframe_signal(symbol, tf)
                 if 'error' not in signal:
                     analysis_results[tf] = signal
             except Exception as e:
-                logger.error(f"Error analyzing {symbol} on {tf}: {e}")
+                logger.error("Error analyzing %s on %s: %s", symbol, tf, e)
         
         # Generate overall assessment
         if analysis_results:
@@ -544,6 +653,23 @@ Current Settings:
         else:
             return {'error': f'No analysis data available for {symbol}'}
     
+    def get_timeframe_signal(self, symbol: str, timeframe: str) -> Dict:
+        """Generate a timeframe signal, reusing the last one while its candle is still open"""
+        tf_seconds = TIMEFRAME_SECONDS.get(timeframe)
+        if not tf_seconds:
+            return self.technical_analyzer.generate_signal(symbol, timeframe)
+        
+        key = (symbol, timeframe)
+        bar_index = int(time.time()) // tf_seconds
+        cached = self._timeframe_signal_cache.get(key)
+        if cached and cached[0] == bar_index:
+            return cached[1]
+        
+        signal = self.technical_analyzer.generate_signal(symbol, timeframe)
+        if 'error' not in signal:
+            self._timeframe_signal_cache[key] = (bar_index, signal)
+        return signal
+    
     def format_analysis_message(self, analysis: Dict) -> str:
         """Format analysis results for Telegram message"""
         symbol = analysis['symbol']
@@ -592,44 +718,46 @@ Current Settings:
         signal_type = signal['signal']
         confidence = signal['confidence']
         current_price = signal['current_price']
+        entry_price = signal.get('entry_price', 0)
+        stop_loss = signal.get('stop_loss', 0)
+        take_profit = signal.get('take_profit', 0)
+        timestamp = signal.get('timestamp', 'N/A')
+        risk_level = risk_assessment.get('risk_level', 'UNKNOWN')
+        risk_reward = risk_assessment.get('risk_reward_ratio', 0)
+        recommendation = risk_assessment.get('recommendation', 'HOLD')
+        position_size = risk_assessment.get('position_size', 0)
+        warnings = risk_assessment.get('warnings')
         
         # Signal emoji
         signal_emoji = "🟢" if signal_type == "BUY" else "🔴" if signal_type == "SELL" else "🟡"
         
-        message = f"""
+        reasons_text = "".join(f"✅ {reason}\n" for reason in signal.get('reasons', []))
+        warnings_text = ""
+        if warnings:
+            warnings_text = "\n⚠️ **Risk Warnings:**\n" + "".join(f"• {warning}\n" for warning in warnings)
+        
+        return f"""
 🎯 **TRADING SIGNAL**
 
 **{symbol} - {signal_emoji} {signal_type}**
 
 💰 **Current Price**: {current_price:.5f}
 🎯 **Confidence**: {confidence}%
-🛡️ **Risk Level**: {risk_assessment.get('risk_level', 'UNKNOWN')}
+🛡️ **Risk Level**: {risk_level}
 
 **Entry Parameters:**
-• Entry Price: {signal.get('entry_price', 0):.5f}
-• Stop Loss: {signal.get('stop_loss', 0):.5f}
-• Take Profit: {signal.get('take_profit', 0):.5f}
-• Risk/Reward: {risk_assessment.get('risk_reward_ratio', 0):.2f}
+• Entry Price: {entry_price:.5f}
+• Stop Loss: {stop_loss:.5f}
+• Take Profit: {take_profit:.5f}
+• Risk/Reward: {risk_reward:.2f}
 
 **Analysis Reasons:**
-"""
-        
-        for reason in signal.get('reasons', []):
-            message += f"✅ {reason}\n"
-        
-        if risk_assessment.get('warnings'):
-            message += "\n⚠️ **Risk Warnings:**\n"
-            for warning in risk_assessment['warnings']:
-                message += f"• {warning}\n"
-        
-        message += f"""
-**Recommendation**: {risk_assessment.get('recommendation', 'HOLD')}
-**Position Size**: ${risk_assessment.get('position_size', 0):.2f}
+{reasons_text}{warnings_text}
+**Recommendation**: {recommendation}
+**Position Size**: ${position_size:.2f}
 
-*Signal generated at {signal.get('timestamp', 'N/A')}*
+*Signal generated at {timestamp}*
         """
-        
-        return message
     
     def format_portfolio_message(self, portfolio_summary: Dict, daily_summary: Dict) -> str:
         """Format portfolio message"""
@@ -639,7 +767,7 @@ Current Settings:
 **Daily Performance:**
 • Signals Sent: {daily_summary['signals_sent']}
 • Trades: {daily_summary['trades_taken']}
-• P&L: ${daily_summary['profit_loss']}
+• P&L: ${daily_summary['profit_loss']:.2f}
 • Remaining: {daily_summary['remaining_signals']} signals
 
 **Account Status:**
@@ -711,24 +839,36 @@ Current Settings:
     
     async def send_daily_summary(self):
         """Send daily summary to subscribed users"""
+        self.prune_inactive_users()
         daily_summary = self.risk_manager.get_daily_summary()
         
-        for user_id, prefs in self.user_preferences.items():
-            if prefs.get('notifications', False):
-                try:
-                    summary_text = f"""
+        # The summary is the same for every subscriber, so render it once
+        summary_text = f"""
 📊 **Daily Trading Summary**
 
 • Signals Sent: {daily_summary['signals_sent']}
 • Trades: {daily_summary['trades_taken']}
-• P&L: ${daily_summary['profit_loss']}
+• P&L: ${daily_summary['profit_loss']:.2f}
 • Remaining: {daily_summary['remaining_signals']} signals
 
 *Generated at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
-                    """
-                    await self.application.bot.send_message(chat_id=user_id, text=summary_text, parse_mode=ParseMode.MARKDOWN)
+        """
+        
+        subscribed_users = [user_id for user_id, prefs in self.user_preferences.items() if prefs.get('notifications', False)]
+        await self.broadcast(subscribed_users, summary_text)
+    
+    async def broadcast(self, user_ids: List[int], text: str):
+        """Send the same message to many users with bounded concurrency"""
+        semaphore = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+        
+        async def send_one(user_id: int):
+            async with semaphore:
+                try:
+                    await self.application.bot.send_message(chat_id=user_id, text=text, parse_mode=ParseMode.MARKDOWN)
                 except Exception as e:
-                    logger.error(f"Error sending daily summary to {user_id}: {e}")
+                    logger.error("Error sending broadcast to %s: %s", user_id, e)
+        
+        await asyncio.gather(*(send_one(user_id) for user_id in user_ids))
     
     def run(self):
         """Start the bot"""
@@ -744,6 +884,13 @@ def main():
         print("Please create a bot using @BotFather and add the token to your .env file")
         return
     
+    # Use the libuv-based event loop when available (not supported on Windows)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     # Create and run bot
     bot = PocketOptionBot()
     bot.run()
@@ -4,12 +4,19 @@ Main bot implementation with callback query fix
 """
 
 import os
+import sys
 import logging
 import asyncio
+import time
+import functools
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import json
-import pandas as pd
+import shelve
+import cachetools
 from dotenv import load_dotenv
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, ContextTypes, filters
@@ -35,65 +42,217 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@dataclass(frozen=True, slots=True)
+class BotConfig:
+    """Bot settings parsed once from the environment"""
+    token: Optional[str]
+    default_asset: str
+    timeframes: Tuple[str, ...]
+    analysis_interval: int
+    risk_level: str
+    max_daily_signals: int
+    account_balance: float
+    
+    @classmethod
+    def from_env(cls) -> 'BotConfig':
+        """Build the configuration from environment variables"""
+        env = os.environ
+        return cls(
+            token=env.get('TELEGRAM_BOT_TOKEN'),
+            default_asset=env.get('DEFAULT_ASSET', 'EURUSD'),
+            timeframes=tuple(env.get('DEFAULT_TIMEFRAMES', '1m,5m,15m,1h,4h,1d').split(',')),
+            analysis_interval=int(env.get('ANALYSIS_INTERVAL', 300)),
+            risk_level=env.get('RISK_LEVEL', 'MEDIUM'),
+            max_daily_signals=int(env.get('MAX_DAILY_SIGNALS', 50)),
+            account_balance=float(env.get('ACCOUNT_BALANCE', 1000))
+        )
+    
+    def to_risk_config(self) -> Dict:
+        """Settings in the dict form expected by RiskManager"""
+        return {
+            'RISK_LEVEL': self.risk_level,
+            'MAX_DAILY_SIGNALS': self.max_daily_signals,
+            'ACCOUNT_BALANCE': self.account_balance
+        }
+
+CONFIG = BotConfig.from_env()
+
+@functools.lru_cache(maxsize=64)
+def analyze_markup(symbol: str) -> InlineKeyboardMarkup:
+    """Keyboard attached to an analysis reply (cached per symbol)"""
+    return InlineKeyboardMarkup([
+        [InlineKeyboardButton("🔄 Analyze Again", callback_data=f"analyze_{symbol}")],
+        [InlineKeyboardButton("🎯 Get Signal", callback_data=f"signal_{symbol}")],
+    ])
+
+@functools.lru_cache(maxsize=64)
+def signal_markup(symbol: str) -> InlineKeyboardMarkup:
+    """Keyboard attached to a signal reply (cached per symbol)"""
+    return InlineKeyboardMarkup([
+        [InlineKeyboardButton("📊 Full Analysis", callback_data=f"analyze_{symbol}")],
+        [InlineKeyboardButton("🔄 New Signal", callback_data=f"signal_{symbol}")],
+    ])
+
+class TTLCache:
+    """Small size-bounded cache whose entries expire after a caller-supplied TTL
+    
+    When a path is given, entries computed before a restart are loaded from a
+    shelve file on open (dropping those older than max_age and keeping the
+    newest maxsize), and the live entries are written back by close(). Lookups
+    never touch the file, so the event loop doesn't block on dbm I/O. An
+    unreadable file is set aside and the cache starts empty. Timestamps use
+    wall clock time so they stay meaningful across restarts.
+    """
+    
+    __slots__ = ('maxsize', '_data', '_path')
+    
+    # Files dbm may create for a shelve path, depending on the backend
+    _STORE_SUFFIXES = ('', '.db', '.dat', '.dir', '.bak')
+    
+    def __init__(self, maxsize: int = 256, path: Optional[str] = None, max_age: Optional[float] = None):
+        self.maxsize = maxsize
+        self._data = OrderedDict()  # repr(key) -> (stored_at, value), oldest first
+        self._path = path
+        if path:
+            self._load(max_age)
+    
+    def _load(self, max_age: Optional[float]):
+        """Load the unexpired, most recent persisted entries"""
+        cutoff = time.time() - max_age if max_age is not None else float('-inf')
+        try:
+            with shelve.open(self._path, flag='r') as store:
+                entries = [(entry[0], key, entry) for key, entry in store.items() if entry[0] > cutoff]
+        except Exception as e:
+            if any(os.path.exists(self._path + suffix) for suffix in self._STORE_SUFFIXES):
+                logger.warning(f"Analysis cache {self._path} unreadable, starting empty: {e}")
+                self._set_aside()
+            return
+        entries.sort(key=lambda item: item[0])
+        for _, key, entry in entries[-self.maxsize:] if self.maxsize else ():
+            self._data[key] = entry
+    
+    def _set_aside(self):
+        """Rename the store's files out of the way so close() starts a fresh one"""
+        for suffix in self._STORE_SUFFIXES:
+            name = self._path + suffix
+            if os.path.exists(name):
+                try:
+                    os.replace(name, name + '.corrupt')
+                except OSError as e:
+                    logger.warning(f"Could not move {name} aside: {e}")
+    
+    def get(self, key, ttl: float):
+        """Return the cached value, or None if missing or older than ttl seconds"""
+        store_key = repr(key)
+        entry = self._data.get(store_key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.time() - stored_at >= ttl:
+            del self._data[store_key]
+            return None
+        self._data.move_to_end(store_key)
+        return value
+    
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entries when full"""
+        store_key = repr(key)
+        self._data[store_key] = (time.time(), value)
+        self._data.move_to_end(store_key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def close(self):
+        """Replace the shelve file's contents with the live entries, if persisting"""
+        if self._path is None:
+            return
+        try:
+            with shelve.open(self._path, flag='n') as store:
+                store.update(self._data)
+        except Exception as e:
+            logger.warning(f"Could not save analysis cache to {self._path}: {e}")
+        self._path = None
+
 class PocketOptionBot:
     """Fixed bot class for Pocket Option trading analysis"""
     
-    def __init__(self):
-        # Configuration - Allow all users by default
-        self.config = {
-            'TELEGRAM_BOT_TOKEN': os.getenv('TELEGRAM_BOT_TOKEN'),
-            'AUTHORIZED_USERS': [],  # Empty = allow all users
-            'DEFAULT_ASSET': os.getenv('DEFAULT_ASSET', 'EURUSD'),
-            'DEFAULT_TIMEFRAMES': os.getenv('DEFAULT_TIMEFRAMES', '1m,5m,15m,1h,4h,1d').split(','),
-            'ANALYSIS_INTERVAL': int(os.getenv('ANALYSIS_INTERVAL', 300)),
-            'RISK_LEVEL': os.getenv('RISK_LEVEL', 'MEDIUM'),
-            'MAX_DAILY_SIGNALS': int(os.getenv('MAX_DAILY_SIGNALS', 50)),
-            'ACCOUNT_BALANCE': float(os.getenv('ACCOUNT_BALANCE', 1000))
-        }
+    __slots__ = (
+        'config', 'technical_analyzer', 'risk_manager', 'market_news', 'portfolio_tracker',
+        'user_preferences', 'analysis_cache', 'last_analysis_time', '_inflight', 'application',
+        '_welcome_template', '_start_markup', '_help_text', '_help_markup',
+        '_callback_handlers', '_callback_action_handlers'
+    )
+    
+    # Free-text keywords mapped to the command they trigger, checked in order
+    _TEXT_KEYWORDS = (
+        (frozenset(('analyze', 'analysis')), 'analyze_command'),
+        (frozenset(('signal',)), 'signal_command'),
+        (frozenset(('portfolio',)), 'portfolio_command'),
+        (frozenset(('news',)), 'news_command')
+    )
+    
+    def __init__(self, config: BotConfig = CONFIG):
+        # Configuration - all users are allowed
+        self.config = config
         
         # Initialize components
         self.technical_analyzer = TechnicalAnalyzer()
-        self.risk_manager = RiskManager(self.config)
+        self.risk_manager = RiskManager(config.to_risk_config())
         self.market_news = MarketNews()
         self.portfolio_tracker = PortfolioTracker()
         
         # Bot state
-        self.user_preferences = {}
-        self.analysis_cache = {}
-        self.last_analysis_time = {}
+        # Per-user state expires so inactive users do not accumulate forever
+        self.user_preferences = cachetools.TTLCache(maxsize=10_000, ttl=30 * 86400)
+        self.analysis_cache = TTLCache(
+            maxsize=256,
+            path=os.getenv('ANALYSIS_CACHE_PATH', 'analysis_cache'),
+            max_age=config.analysis_interval
+        )
+        self._inflight = {}  # key -> task computing it, shared by concurrent callers
+        self.last_analysis_time = cachetools.TTLCache(maxsize=10_000, ttl=3600)
+        
+        # Static messages and keyboards are built once and reused by every command
+        self.build_static_messages()
+        
+        # Inline keyboard callback dispatch tables
+        self._callback_handlers = {
+            "quick_analyze": self.analyze_command,
+            "quick_signal": self.signal_command,
+            "quick_portfolio": self.portfolio_command,
+            "quick_news": self.news_command,
+            "refresh_help": self.help_command
+        }
+        self._callback_action_handlers = {
+            "analyze": self.analyze_command,
+            "signal": self.signal_command
+        }
         
         # Create bot application
-        self.application = Application.builder().token(self.config['TELEGRAM_BOT_TOKEN']).build()
+        self.application = (
+            Application.builder()
+            .token(self.config.token)
+            .concurrent_updates(True)
+            .post_init(self.post_init)
+            .post_shutdown(self.post_shutdown)
+            .build()
+        )
         self.setup_handlers()
     
-    def setup_handlers(self):
-        """Setup bot command and message handlers"""
-        # Command handlers
-        self.application.add_handler(CommandHandler("start", self.start_command))
-        self.application.add_handler(CommandHandler("help", self.help_command))
-        self.application.add_handler(CommandHandler("analyze", self.analyze_command))
-        self.application.add_handler(CommandHandler("signal", self.signal_command))
-        self.application.add_handler(CommandHandler("timeframes", self.timeframes_command))
-        self.application.add_handler(CommandHandler("portfolio", self.portfolio_command))
-        self.application.add_handler(CommandHandler("news", self.news_command))
-        self.application.add_handler(CommandHandler("settings", self.settings_command))
-        self.application.add_handler(CommandHandler("risk", self.risk_command))
-        self.application.add_handler(CommandHandler("status", self.status_command))
-        self.application.add_handler(CommandHandler("subscribe", self.subscribe_command))
-        self.application.add_handler(CommandHandler("unsubscribe", self.unsubscribe_command))
-        
-        # Callback query handlers - Fixed to handle callback queries properly
-        self.application.add_handler(CallbackQueryHandler(self.fixed_button_callback))
-        
-        # Message handlers
-        self.application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_text))
+    async def post_init(self, application: Application):
+        """Size the thread pool used to run analysis off the event loop"""
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=8))
     
-    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /start command"""
-        user_id = update.effective_user.id
-        user_name = update.effective_user.first_name or "User"
+    async def post_shutdown(self, application: Application):
+        """Persist cached analysis so it survives the restart"""
+        self.analysis_cache.close()
+    
+    def build_static_messages(self):
+        """Pre-render the text and keyboards of commands whose output never changes
         
-        welcome_text = f"""
+        Texts are interned so every reply shares one string object.
+        """
+        self._welcome_template = sys.intern("""
 🤖 **Pocket Option Trading Bot**
 
 Welcome, {user_name}! 📈
@@ -108,21 +267,15 @@ Welcome, {user_name}! 📈
 /help - Show detailed help
 
 **Quick Actions:**
-"""
-        
-        keyboard = [
+""")
+        self._start_markup = InlineKeyboardMarkup([
             [InlineKeyboardButton("📊 Analyze Market", callback_data="quick_analyze")],
             [InlineKeyboardButton("🎯 Get Signal", callback_data="quick_signal")],
             [InlineKeyboardButton("📈 Portfolio", callback_data="quick_portfolio")],
             [InlineKeyboardButton("📰 Market News", callback_data="quick_news")],
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        ])
         
-        await update.message.reply_text(welcome_text, parse_mode=ParseMode.MARKDOWN, reply_markup=reply_markup)
-    
-    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /help command"""
-        help_text = """
+        self._help_text = sys.intern("""
 📚 **Bot Commands & Features**
 
 **Core Analysis:**
@@ -143,116 +296,95 @@ Welcome, {user_name}! 📈
 **Supported Symbols:** EURUSD, GBPUSD, USDJPY, BTCUSD, ETHUSD, etc.
 
 ⚠️ **Disclaimer:** This bot is for educational purposes only. Always do your own research before trading.
-        """
-        
-        keyboard = [
+        """)
+        self._help_markup = InlineKeyboardMarkup([
             [InlineKeyboardButton("🔄 Refresh", callback_data="refresh_help")],
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        ])
+    
+    def setup_handlers(self):
+        """Setup bot command and message handlers"""
+        # Command handlers
+        self.application.add_handler(CommandHandler("start", self.start_command))
+        self.application.add_handler(CommandHandler("help", self.help_command))
+        self.application.add_handler(CommandHandler("analyze", self.analyze_command, block=False))
+        self.application.add_handler(CommandHandler("signal", self.signal_command, block=False))
+        self.application.add_handler(CommandHandler("timeframes", self.timeframes_command))
+        self.application.add_handler(CommandHandler("portfolio", self.portfolio_command))
+        self.application.add_handler(CommandHandler("news", self.news_command))
+        self.application.add_handler(CommandHandler("settings", self.settings_command))
+        self.application.add_handler(CommandHandler("risk", self.risk_command))
+        self.application.add_handler(CommandHandler("status", self.status_command))
+        self.application.add_handler(CommandHandler("subscribe", self.subscribe_command))
+        self.application.add_handler(CommandHandler("unsubscribe", self.unsubscribe_command))
+        
+        # Callback query handlers - Fixed to handle callback queries properly
+        self.application.add_handler(CallbackQueryHandler(self.fixed_button_callback, block=False))
         
-        await update.message.reply_text(help_text, parse_mode=ParseMode.MARKDOWN, reply_markup=reply_markup)
+        # Message handlers
+        self.application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_text))
     
-    async def analyze_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /analyze command"""
-        # For callback queries, we need to get user and send message differently
-        if hasattr(update, 'callback_query') and update.callback_query:
-            query = update.callback_query
+    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /start command"""
+        user_name = update.effective_user.first_name or "User"
+        welcome_text = self._welcome_template.format(user_name=user_name)
+        
+        await update.message.reply_text(welcome_text, parse_mode=ParseMode.MARKDOWN, reply_markup=self._start_markup)
+    
+    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /help command"""
+        await update.message.reply_text(self._help_text, parse_mode=ParseMode.MARKDOWN, reply_markup=self._help_markup)
+    
+    async def respond(self, update: Update, text: str, reply_markup: Optional[InlineKeyboardMarkup] = None,
+                      parse_mode: Optional[str] = ParseMode.MARKDOWN):
+        """Reply to a command, or edit the message when triggered from an inline button"""
+        query = update.callback_query
+        if query is not None:
             await query.answer()
-            user_id = query.from_user.id
-            symbol = context.args[0] if context.args else self.config['DEFAULT_ASSET']
-            
-            try:
-                analysis_text = await self.generate_analysis_text(user_id, symbol)
-                await query.edit_message_text(analysis_text, parse_mode=ParseMode.MARKDOWN)
-            except Exception as e:
-                await query.edit_message_text(f"❌ Error analyzing {symbol}: {str(e)}")
+            await query.edit_message_text(text, parse_mode=parse_mode)
         else:
-            # Regular command
-            user_id = update.effective_user.id
-            symbol = context.args[0] if context.args else self.config['DEFAULT_ASSET']
-            
-            try:
-                analysis_text = await self.generate_analysis_text(user_id, symbol)
-                keyboard = [
-                    [InlineKeyboardButton("🔄 Analyze Again", callback_data=f"analyze_{symbol}")],
-                    [InlineKeyboardButton("🎯 Get Signal", callback_data=f"signal_{symbol}")],
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                
-                await update.message.reply_text(analysis_text, parse_mode=ParseMode.MARKDOWN, reply_markup=reply_markup)
-            except Exception as e:
-                await update.message.reply_text(f"❌ Error analyzing {symbol}: {str(e)}")
+            await update.message.reply_text(text, parse_mode=parse_mode, reply_markup=reply_markup)
+    
+    async def analyze_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /analyze command"""
+        user_id = update.effective_user.id
+        symbol = context.args[0] if context.args else self.config.default_asset
+        
+        try:
+            analysis_text = await self.generate_analysis_text(user_id, symbol)
+            await self.respond(update, analysis_text, analyze_markup(symbol))
+        except Exception as e:
+            await self.respond(update, f"❌ Error analyzing {symbol}: {str(e)}", parse_mode=None)
     
     async def signal_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /signal command"""
-        if hasattr(update, 'callback_query') and update.callback_query:
-            query = update.callback_query
-            await query.answer()
-            user_id = query.from_user.id
-            symbol = context.args[0] if context.args else self.config['DEFAULT_ASSET']
-            
-            try:
-                signal_text = await self.generate_signal_text(user_id, symbol)
-                await query.edit_message_text(signal_text, parse_mode=ParseMode.MARKDOWN)
-            except Exception as e:
-                await query.edit_message_text(f"❌ Error generating signal for {symbol}: {str(e)}")
-        else:
-            user_id = update.effective_user.id
-            symbol = context.args[0] if context.args else self.config['DEFAULT_ASSET']
-            
-            try:
-                signal_text = await self.generate_signal_text(user_id, symbol)
-                keyboard = [
-                    [InlineKeyboardButton("📊 Full Analysis", callback_data=f"analyze_{symbol}")],
-                    [InlineKeyboardButton("🔄 New Signal", callback_data=f"signal_{symbol}")],
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                
-                await update.message.reply_text(signal_text, parse_mode=ParseMode.MARKDOWN, reply_markup=reply_markup)
-            except Exception as e:
-                await update.message.reply_text(f"❌ Error generating signal for {symbol}: {str(e)}")
+        user_id = update.effective_user.id
+        symbol = context.args[0] if context.args else self.config.default_asset
+        
+        try:
+            signal_text = await self.generate_signal_text(user_id, symbol)
+            await self.respond(update, signal_text, signal_markup(symbol))
+        except Exception as e:
+            await self.respond(update, f"❌ Error generating signal for {symbol}: {str(e)}", parse_mode=None)
     
     async def portfolio_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /portfolio command"""
-        if hasattr(update, 'callback_query') and update.callback_query:
-            query = update.callback_query
-            await query.answer()
-            user_id = query.from_user.id
-            
-            try:
-                portfolio_text = await self.generate_portfolio_text(user_id)
-                await query.edit_message_text(portfolio_text, parse_mode=ParseMode.MARKDOWN)
-            except Exception as e:
-                await query.edit_message_text(f"❌ Error accessing portfolio: {str(e)}")
-        else:
-            user_id = update.effective_user.id
-            
-            try:
-                portfolio_text = await self.generate_portfolio_text(user_id)
-                await update.message.reply_text(portfolio_text, parse_mode=ParseMode.MARKDOWN)
-            except Exception as e:
-                await update.message.reply_text(f"❌ Error accessing portfolio: {str(e)}")
+        user_id = update.effective_user.id
+        
+        try:
+            portfolio_text = await self.generate_portfolio_text(user_id)
+            await self.respond(update, portfolio_text)
+        except Exception as e:
+            await self.respond(update, f"❌ Error accessing portfolio: {str(e)}", parse_mode=None)
     
     async def news_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /news command"""
-        if hasattr(update, 'callback_query') and update.callback_query:
-            query = update.callback_query
-            await query.answer()
-            user_id = query.from_user.id
-            
-            try:
-                news_text = await self.generate_news_text(user_id)
-                await query.edit_message_text(news_text, parse_mode=ParseMode.MARKDOWN)
-            except Exception as e:
-                await query.edit_message_text(f"❌ Error fetching news: {str(e)}")
-        else:
-            user_id = update.effective_user.id
-            
-            try:
-                news_text = await self.generate_news_text(user_id)
-                await update.message.reply_text(news_text, parse_mode=ParseMode.MARKDOWN)
-            except Exception as e:
-                await update.message.reply_text(f"❌ Error fetching news: {str(e)}")
+        user_id = update.effective_user.id
+        
+        try:
+            news_text = await self.generate_news_text(user_id)
+            await self.respond(update, news_text)
+        except Exception as e:
+            await self.respond(update, f"❌ Error fetching news: {str(e)}", parse_mode=None)
     
     async def fixed_button_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Fixed callback handler that properly handles callback queries"""
@@ -261,34 +393,40 @@ Welcome, {user_name}! 📈
         
         data = query.data
         
-        if data == "quick_analyze":
-            context.args = []
-            await self.analyze_command(update, context)
-        elif data == "quick_signal":
+        handler = self._callback_handlers.get(data)
+        if handler:
             context.args = []
-            await self.signal_command(update, context)
-        elif data == "quick_portfolio":
-            await self.portfolio_command(update, context)
-        elif data == "quick_news":
-            await self.news_command(update, context)
-        elif data.startswith("analyze_"):
-            symbol = data.replace("analyze_", "")
-            context.args = [symbol]
-            await self.analyze_command(update, context)
-        elif data.startswith("signal_"):
-            symbol = data.replace("signal_", "")
-            context.args = [symbol]
-            await self.signal_command(update, context)
-        elif data == "refresh_help":
-            await self.help_command(update, context)
+            await handler(update, context)
+            return
+        
+        action, _, arg = data.partition("_")
+        handler = self._callback_action_handlers.get(action)
+        if handler:
+            context.args = [arg] if arg else []
+            await handler(update, context)
         else:
             await query.edit_message_text("🔄 Feature coming soon!")
     
+    async def run_single_flight(self, key, func, *args):
+        """Run func in a worker thread, sharing one call among concurrent requests for the same key"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(asyncio.to_thread(func, *args))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one cancelled waiter does not cancel the shared computation
+        return await asyncio.shield(task)
+    
     async def generate_analysis_text(self, user_id: int, symbol: str) -> str:
         """Generate analysis text"""
+        cache_key = ("analysis", symbol)
+        cached_text = self.analysis_cache.get(cache_key, self.config.analysis_interval)
+        if cached_text is not None:
+            return cached_text
+        
         try:
             # Get analysis from technical analyzer
-            analysis = self.technical_analyzer.get_quick_analysis(symbol)
+            analysis = await self.run_single_flight(cache_key, self.technical_analyzer.get_quick_analysis, symbol)
             
             if analysis:
                 text = f"""
@@ -302,6 +440,7 @@ Welcome, {user_name}! 📈
 
 *Analysis based on multiple timeframes*
                 """
+                self.analysis_cache.set(cache_key, text)
                 return text
             else:
                 return f"❌ No data available for {symbol}"
@@ -310,9 +449,14 @@ Welcome, {user_name}! 📈
     
     async def generate_signal_text(self, user_id: int, symbol: str) -> str:
         """Generate signal text"""
+        cache_key = ("signal", symbol)
+        cached_text = self.analysis_cache.get(cache_key, self.config.analysis_interval)
+        if cached_text is not None:
+            return cached_text
+        
         try:
             # Get signal from technical analyzer
-            signal = self.technical_analyzer.get_quick_signal(symbol)
+            signal = await self.run_single_flight(cache_key, self.technical_analyzer.get_quick_signal, symbol)
             
             if signal:
                 text = f"""
@@ -326,6 +470,7 @@ Welcome, {user_name}! 📈
 
 ⚠️ *For educational purposes only*
                 """
+                self.analysis_cache.set(cache_key, text)
                 return text
             else:
                 return f"❌ No signal available for {symbol}"
@@ -335,7 +480,7 @@ Welcome, {user_name}! 📈
     async def generate_portfolio_text(self, user_id: int) -> str:
         """Generate portfolio text"""
         try:
-            summary = self.portfolio_tracker.get_summary()
+            summary = await asyncio.to_thread(self.portfolio_tracker.get_summary)
             text = f"""
 📈 **Portfolio Summary**
 
@@ -353,13 +498,13 @@ Welcome, {user_name}! 📈
     async def generate_news_text(self, user_id: int) -> str:
         """Generate news text"""
         try:
-            news_items = self.market_news.get_market_sentiment()
+            news_items = await asyncio.to_thread(self.market_news.get_market_sentiment)
             if news_items:
-                text = "📰 **Market News**\\n\\n"
-                for item in news_items[:3]:  # Show first 3 items
-                    text += f"• {item}\\n"
-                text += "\\n*News sentiment analysis*"
-                return text
+                parts = ["📰 **Market News**", ""]
+                parts.extend(f"• {item}" for item in news_items[:3])  # Show first 3 items
+                parts.append("")
+                parts.append("*News sentiment analysis*")
+                return "\n".join(parts)
             else:
                 return "📰 No recent news available"
         except Exception as e:
@@ -386,17 +531,12 @@ Welcome, {user_name}! 📈
     
     async def handle_text(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle text messages"""
-        text = update.message.text.lower()
-        if 'analyze' in text or 'analysis' in text:
-            await self.analyze_command(update, context)
-        elif 'signal' in text:
-            await self.signal_command(update, context)
-        elif 'portfolio' in text:
-            await self.portfolio_command(update, context)
-        elif 'news' in text:
-            await self.news_command(update, context)
-        else:
-            await update.message.reply_text("I can help with market analysis! Try /help for commands.")
+        words = {word.strip('.,!?') for word in update.message.text.lower().split()}
+        for keywords, handler_name in self._TEXT_KEYWORDS:
+            if not keywords.isdisjoint(words):
+                await getattr(self, handler_name)(update, context)
+                return
+        await update.message.reply_text("I can help with market analysis! Try /help for commands.")
     
     def run(self):
         """Start the bot"""
@@ -407,18 +547,18 @@ Welcome, {user_name}! 📈
 def main():
     """Main function to run the bot"""
     # Check if bot token is configured
-    if not os.getenv('TELEGRAM_BOT_TOKEN'):
+    if not CONFIG.token:
         print("❌ Error: TELEGRAM_BOT_TOKEN not found in .env file")
         print("Please create a bot using @BotFather and add the token to your .env file")
         return
     
-    if os.getenv('TELEGRAM_BOT_TOKEN') == 'your_telegram_bot_token_here':
+    if CONFIG.token == 'your_telegram_bot_token_here':
         print("❌ Error: Please configure your bot token in .env file")
         print("Replace 'your_telegram_bot_token_here' with your actual token from @BotFather")
         return
     
     # Create and run bot
-    bot = PocketOptionBot()
+    bot = PocketOptionBot(CONFIG)
     bot.run()
 
 if __name__ == "__main__":
@@ -3,137 +3,548 @@ Market News Module for Pocket Option Trading Bot
 Fetches and processes real-time market news and economic events
 """
 
+import asyncio
+import re
+import numpy as np
+import aiohttp
+import cachetools
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional
 import logging
 import os
-from dotenv import load_dotenv
+import random
+import time
+from dataclasses import dataclass
 
-load_dotenv()
+try:
+    import redis
+except ImportError:
+    redis = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+if orjson is not None:
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+else:
+    json_loads = json.loads
+    json_dumps = json.dumps
+
+# Only walk the filesystem for a .env file when the provider keys are not
+# already in the environment
+PROVIDER_KEY_VARS = ('NEWS_API_KEY', 'ALPHA_VANTAGE_API_KEY', 'FINNHUB_API_KEY')
+if not all(os.environ.get(var) for var in PROVIDER_KEY_VARS):
+    from dotenv import load_dotenv
+    load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+NEWSAPI_URL = "https://newsapi.org/v2/everything"
+FINNHUB_URL = "https://finnhub.io/api/v1/news"
+REQUEST_TIMEOUT = 10
+ISO_FORMAT = "%Y-%m-%dT%H:%M:%SZ"  # UTC, as NewsAPI reports publishedAt
+PROVIDER_POOL_PREFIXES = ('https://newsapi.org/', 'https://finnhub.io/')
+
+# Shared news cache (Redis). The server should run with
+# `maxmemory-policy allkeys-lfu` so rarely read keys are evicted first.
+NEWS_CACHE_KEY = "news:latest"
+NEWS_STALE_KEY = "news:latest:stale"
+NEWS_LIMIT = 5  # articles per call; NewsAPI is asked for exactly this many
+NEWS_CACHE_TTL = int(os.getenv('NEWS_CACHE_TTL', 120))
+NEWS_STALE_TTL = 24 * 3600
+
+# Per-source in-process cache, used with or without Redis
+SOURCE_CACHE_TTL = 120
+
+class JitteredRetry(Retry):
+    """urllib3 Retry with random jitter on the backoff and a log line per retry"""
+    
+    def get_backoff_time(self) -> float:
+        return super().get_backoff_time() + random.uniform(0, 0.25)
+    
+    def increment(self, *args, **kwargs):
+        new_retry = super().increment(*args, **kwargs)
+        logger.warning(f"Retrying news request (retry {len(new_retry.history)} of {self.total + len(self.history)})")
+        return new_retry
+
+@dataclass(frozen=True, slots=True)
+class Article:
+    """A single news article"""
+    title: str
+    description: str
+    url: str
+    published_at: str
+    source: str
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Article":
+        source = data.get('source', '')
+        if isinstance(source, dict):  # NewsAPI nests the source name
+            source = source.get('name', '')
+        return cls(
+            title=data.get('title') or '',
+            description=data.get('description') or '',
+            url=data.get('url') or '',
+            published_at=data.get('publishedAt') or '',
+            source=source or ''
+        )
+    
+    def to_dict(self) -> Dict:
+        return {
+            'title': self.title,
+            'description': self.description,
+            'url': self.url,
+            'publishedAt': self.published_at,
+            'source': self.source
+        }
+
+@dataclass(frozen=True, slots=True)
+class EconomicEvent:
+    """A scheduled economic calendar release"""
+    time: str
+    event: str
+    currency: str
+    impact: str
+    forecast: str
+    previous: str
+    
+    def to_dict(self) -> Dict:
+        return {
+            'time': self.time,
+            'event': self.event,
+            'currency': self.currency,
+            'impact': self.impact,
+            'forecast': self.forecast,
+            'previous': self.previous
+        }
+
+# Sample data served when no news API is configured:
+# (title, description, url, hours ago, source)
+FALLBACK_ARTICLES = (
+    ('EUR/USD Steady as Markets Await Central Bank Decisions',
+     'The euro remains stable against the dollar as investors monitor upcoming central bank policy meetings and economic data releases.',
+     'https://example.com/eur-usd-analysis', 1, 'Market Analysis'),
+    ('Gold Prices Edge Higher on Safe-Haven Demand',
+     'Gold futures advance as geopolitical tensions and economic uncertainty drive investors toward safe-haven assets.',
+     'https://example.com/gold-outlook', 2, 'Commodities Report'),
+    ('Bitcoin Maintains Support Above $40,000',
+     'Cryptocurrency markets show resilience as Bitcoin holds key support levels amid ongoing institutional adoption.',
+     'https://example.com/crypto-update', 3, 'Crypto Daily'),
+    ('Oil Prices Fluctuate on Supply and Demand Concerns',
+     'Crude oil futures trade mixed as market participants balance supply constraints against global demand uncertainties.',
+     'https://example.com/oil-market', 4, 'Energy Markets'),
+    ('Stock Markets Show Cautious Optimism',
+     'Major indices advance modestly as corporate earnings season progresses and economic indicators show mixed signals.',
+     'https://example.com/stock-outlook', 5, 'Equity Markets')
+)
+
+ECONOMIC_CALENDAR = (
+    EconomicEvent('08:30', 'US Non-Farm Payrolls', 'USD', 'HIGH', '200K', '180K'),
+    EconomicEvent('10:00', 'EUR Interest Rate Decision', 'EUR', 'HIGH', '0.50%', '0.25%'),
+    EconomicEvent('14:30', 'Crude Oil Inventories', 'USD', 'MEDIUM', '-2.5M', '-3.2M')
+)
+
+MARKET_SENTIMENT = {
+    'overall': 'NEUTRAL',
+    'risk_appetite': 'MODERATE',
+    'vix_level': 18.5,
+    'dollar_strength': 102.3,
+    'gold_trend': 'BULLISH',
+    'crypto_sentiment': 'BULLISH',
+    'forex_volatility': 'MODERATE'
+}
+
+# pair -> ((title, impact, hours ago), ...)
+FOREX_PAIR_NEWS = {
+    'EURUSD': (
+        ('ECB Officials Signal Potential Rate Hike Pause', 'BEARISH_EUR', 0),
+        ('US Dollar Strengthens on Fed Hawkish Comments', 'BEARISH_EUR', 2)
+    ),
+    'GBPUSD': (
+        ('BoE Governor Discusses Inflation Control Measures', 'BULLISH_GBP', 1),
+    ),
+    'USDJPY': (
+        ('BoJ Maintains Ultra-Loose Policy Stance', 'BULLISH_JPY', 3),
+    )
+}
+
+# (headline, impact, assets affected)
+BREAKING_NEWS = (
+    ('Major Economic Data Release Scheduled for Next Hour', 'HIGH', ('EURUSD', 'GBPUSD', 'USDJPY')),
+)
+
+FALLBACK_HOURS = frozenset(article[3] for article in FALLBACK_ARTICLES)
+FOREX_NEWS_HOURS = frozenset(item[2] for items in FOREX_PAIR_NEWS.values() for item in items)
+
+def iso_offsets(now: datetime, hours) -> Dict[int, str]:
+    """Format ``now`` minus each distinct hour offset exactly once"""
+    return {h: (now - timedelta(hours=h)).isoformat() for h in hours}
+
+class CircuitBreaker:
+    """Skips a failing news source for a cooldown period instead of waiting on its timeout
+    
+    After fail_max consecutive failures the breaker opens; once reset_timeout
+    seconds have passed a single probe request is let through (half-open) and
+    its outcome closes or re-opens the breaker.
+    """
+    
+    def __init__(self, name: str, fail_max: int = 5, reset_timeout: float = 60):
+        self.name = name
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+    
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+    
+    def allow_request(self) -> bool:
+        """Whether a request to the source may be attempted now"""
+        state = self.state
+        if state == 'half-open':
+            # Admit this caller as the probe; restarting the cooldown keeps the
+            # breaker open for everyone else until the probe reports back
+            self.opened_at = time.monotonic()
+            return True
+        return state == 'closed'
+    
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info(f"{self.name} circuit closed")
+        self.failures = 0
+        self.opened_at = None
+    
+    def record_failure(self):
+        self.failures += 1
+        if self.state == 'half-open' or self.failures >= self.fail_max:
+            self.opened_at = time.monotonic()
+            logger.warning(f"{self.name} circuit open for {self.reset_timeout}s after {self.failures} failures")
+
 class MarketNews:
     """Market news fetcher and processor"""
     
+    __slots__ = (
+        'news_api_key', 'api_key', 'finnhub_key', '_newsapi_enabled', '_finnhub_enabled',
+        'session', 'cache', 'cache_hits', 'cache_misses', '_source_cache', '_last_good', '_breakers'
+    )
+    
     def __init__(self):
         self.news_api_key = os.getenv('NEWS_API_KEY', 'demo')
         self.api_key = os.getenv('ALPHA_VANTAGE_API_KEY', 'demo')
         self.finnhub_key = os.getenv('FINNHUB_API_KEY', 'demo')
+        self._newsapi_enabled = self.news_api_key not in (None, '', 'demo')
+        self._finnhub_enabled = self.finnhub_key not in (None, '', 'demo')
+        self.session = self._create_session()
+        self.cache = self._connect_cache()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._source_cache = cachetools.TTLCache(maxsize=32, ttl=SOURCE_CACHE_TTL)
+        self._last_good = {}  # source -> last successful payload, served on errors
+        self._breakers = {
+            'newsapi': CircuitBreaker('NewsAPI'),
+            'finnhub': CircuitBreaker('Finnhub')
+        }
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """Close pooled HTTP connections"""
+        self.session.close()
+    
+    def _create_session(self) -> requests.Session:
+        """HTTP session that keeps connections to the news APIs alive between calls"""
+        session = requests.Session()
+        # Only idempotent GETs are retried, with exponential backoff plus jitter
+        retry = JitteredRetry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        # Each provider gets its own pool (the longest matching prefix wins), so a
+        # slow or hanging provider cannot exhaust the connections of the other
+        for prefix in PROVIDER_POOL_PREFIXES:
+            session.mount(prefix, HTTPAdapter(pool_connections=5, pool_maxsize=10, max_retries=retry))
+        session.headers.update({'Accept': 'application/json', 'User-Agent': 'PocketOptionBot/1.0'})
+        return session
+    
+    def _connect_cache(self):
+        """Connect to the Redis news cache if REDIS_URL is configured"""
+        redis_url = os.getenv('REDIS_URL')
+        if not redis_url or redis is None:
+            return None
+        try:
+            client = redis.Redis.from_url(redis_url, socket_timeout=1, socket_connect_timeout=1)
+            client.ping()
+            return client
+        except Exception as e:
+            logger.warning(f"Redis news cache unavailable: {e}")
+            return None
+    
+    def _cache_get(self, key: str) -> Optional[Dict]:
+        """Read a cached news payload"""
+        if self.cache is None:
+            return None
+        try:
+            raw = self.cache.get(key)
+        except Exception as e:
+            logger.warning(f"Redis read error: {e}")
+            return None
+        return json_loads(raw) if raw else None
+    
+    def _cache_store(self, news_data: Dict, limit: int):
+        """Store fresh news plus a longer-lived stale copy for upstream outages"""
+        if self.cache is None:
+            return
+        try:
+            payload = json_dumps(news_data)
+            pipe = self.cache.pipeline()
+            pipe.setex(f"{NEWS_CACHE_KEY}:{limit}", NEWS_CACHE_TTL, payload)
+            pipe.setex(f"{NEWS_STALE_KEY}:{limit}", NEWS_STALE_TTL, payload)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis write error: {e}")
+    
+    async def _off_loop(self, func, *args):
+        """Run a helper that may talk to Redis in a worker thread
+        
+        redis-py blocks, so with Redis configured its round trips are kept off
+        the event loop; without it the helper is cheap and runs inline.
+        """
+        if self.cache is None:
+            return func(*args)
+        return await asyncio.to_thread(func, *args)
+    
+    def _cached_news(self, limit: int) -> Optional[Dict]:
+        """Return fresh cached news and count the hit or miss"""
+        news_data = self._cache_get(f"{NEWS_CACHE_KEY}:{limit}")
+        if self.cache is not None:
+            if news_data:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+            logger.info(f"News cache {'hit' if news_data else 'miss'} (hits={self.cache_hits}, misses={self.cache_misses})")
+        return news_data
+    
+    def _resolve_news(self, news_data: Optional[Dict], limit: int) -> Dict:
+        """Cache fetched news, or fall back to the stale copy and then sample news"""
+        if news_data:
+            news_data = {**news_data, 'articles': news_data.get('articles', [])[:limit]}
+            self._cache_store(news_data, limit)
+            return news_data
+        return self._cache_get(f"{NEWS_STALE_KEY}:{limit}") or self._get_fallback_news()
+    
+    def get_latest_news(self, limit: int = NEWS_LIMIT) -> Dict:
+        """Get up to ``limit`` latest market news articles from multiple sources
+        
+        Sources are tried in order and the first with articles wins, so a slow
+        provider only costs its own timeout; aget_latest_news merges them all.
+        """
+        cached = self._cached_news(limit)
+        if cached:
+            return cached
         
-    def get_latest_news(self) -> Dict:
-        """Get latest market news from multiple sources"""
         try:
             # Try multiple news sources
-            news_data = self._get_news_from_newsapi()
+            news_data = self._get_news_from_newsapi(limit)
             if not news_data:
-                news_data = self._get_news_from_finnhub()
-            if not news_data:
-                news_data = self._get_fallback_news()
-            
-            return news_data
+                news_data = self._get_news_from_finnhub(limit)
+        except Exception as e:
+            logger.error(f"Error fetching news: {e}")
+            news_data = None
+        return self._resolve_news(news_data, limit)
+    
+    async def aget_latest_news(self, limit: int = NEWS_LIMIT) -> Dict:
+        """Get latest market news, querying all sources concurrently
+        
+        Articles from every source are merged and deduplicated; the total wait
+        is the slowest response instead of the sum of all of them.
+        """
+        cached = await self._off_loop(self._cached_news, limit)
+        if cached:
+            return cached
+        
+        news_data = None
+        try:
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)) as session:
+                results = await asyncio.gather(
+                    self._aget_news_from_newsapi(session, limit),
+                    self._aget_news_from_finnhub(session, limit),
+                    return_exceptions=True
+                )
+            news_data = merge_articles(results, limit)
         except Exception as e:
             logger.error(f"Error fetching news: {e}")
-            return self._get_fallback_news()
+        return await self._off_loop(self._resolve_news, news_data, limit)
+    
+    def get_articles(self, limit: int = NEWS_LIMIT) -> List[Article]:
+        """Latest news as immutable Article records"""
+        return [Article.from_dict(article) for article in self.get_latest_news(limit).get('articles', [])]
+    
+    def _remember(self, source: str, limit: int, news_data: Optional[Dict]) -> Optional[Dict]:
+        """Cache a successful payload from a news source"""
+        self._breakers[source].record_success()
+        if news_data:
+            self._source_cache[(source, limit)] = news_data
+            self._last_good[source] = news_data
+        return news_data
     
-    def _get_news_from_newsapi(self) -> Optional[Dict]:
+    def _newsapi_params(self, limit: int) -> Dict:
+        """Query parameters for NewsAPI"""
+        return {
+            'apiKey': self.news_api_key,
+            'q': 'forex OR "currency trading" OR "financial markets" OR stocks OR cryptocurrency',
+            'language': 'en',
+            'sortBy': 'publishedAt',
+            'pageSize': limit
+        }
+    
+    def _finnhub_params(self) -> Dict:
+        """Query parameters for Finnhub"""
+        return {
+            'token': self.finnhub_key,
+            'category': 'forex',
+            'minId': 0
+        }
+    
+    def _convert_finnhub_articles(self, data: List[Dict], limit: int) -> Dict:
+        """Convert Finnhub news items to the standard article format"""
+        # Finnhub timestamps are whole epoch seconds; format them in UTC like
+        # NewsAPI does, without building a datetime per article
+        strftime, gmtime = time.strftime, time.gmtime
+        articles = [
+            {
+                'title': article.get('headline', 'No title'),
+                'description': article.get('summary', ''),
+                'url': article.get('url', '#'),
+                'publishedAt': strftime(ISO_FORMAT, gmtime(article.get('datetime', 0))),
+                'source': 'Finnhub'
+            }
+            for article in data[:limit]
+        ]
+        
+        return {'articles': articles}
+    
+    def _get_news_from_newsapi(self, limit: int = NEWS_LIMIT) -> Optional[Dict]:
         """Fetch news from NewsAPI (requires API key)"""
-        if self.news_api_key == 'demo':
+        if not self._newsapi_enabled:
             return None
+        cached = self._source_cache.get(('newsapi', limit))
+        if cached is not None:
+            return cached
+        if not self._breakers['newsapi'].allow_request():
+            return self._last_good.get('newsapi')
             
         try:
-            url = f"https://newsapi.org/v2/everything"
-            params = {
-                'apiKey': self.news_api_key,
-                'q': 'forex OR "currency trading" OR "financial markets" OR stocks OR cryptocurrency',
-                'language': 'en',
-                'sortBy': 'publishedAt',
-                'pageSize': 10
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(NEWSAPI_URL, params=self._newsapi_params(limit), timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
-            return response.json()
+            return self._remember('newsapi', limit, json_loads(response.content))
         except Exception as e:
             logger.error(f"NewsAPI error: {e}")
-            return None
+            self._breakers['newsapi'].record_failure()
+            return self._last_good.get('newsapi')
     
-    def _get_news_from_finnhub(self) -> Optional[Dict]:
+    def _get_news_from_finnhub(self, limit: int = NEWS_LIMIT) -> Optional[Dict]:
         """Fetch news from Finnhub (requires API key)"""
-        if self.finnhub_key == 'demo':
+        if not self._finnhub_enabled:
             return None
+        cached = self._source_cache.get(('finnhub', limit))
+        if cached is not None:
+            return cached
+        if not self._breakers['finnhub'].allow_request():
+            return self._last_good.get('finnhub')
             
         try:
-            url = f"https://finnhub.io/api/v1/news"
-            params = {
-                'token': self.finnhub_key,
-                'category': 'forex',
-                'minId': 0
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(FINNHUB_URL, params=self._finnhub_params(), timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
-            data = response.json()
-            
-            # Convert to standard format
-            articles = []
-            for article in data[:5]:
-                articles.append({
-                    'title': article.get('headline', 'No title'),
-                    'description': article.get('summary', ''),
-                    'url': article.get('url', '#'),
-                    'publishedAt': datetime.fromtimestamp(article.get('datetime', 0)).isoformat(),
-                    'source': 'Finnhub'
-                })
-            
-            return {'articles': articles}
+            return self._remember('finnhub', limit, self._convert_finnhub_articles(json_loads(response.content), limit))
         except Exception as e:
             logger.error(f"Finnhub error: {e}")
+            self._breakers['finnhub'].record_failure()
+            return self._last_good.get('finnhub')
+    
+    async def _aget_news_from_newsapi(self, session: aiohttp.ClientSession, limit: int = NEWS_LIMIT) -> Optional[Dict]:
+        """Async twin of _get_news_from_newsapi"""
+        if not self._newsapi_enabled:
             return None
+        cached = self._source_cache.get(('newsapi', limit))
+        if cached is not None:
+            return cached
+        if not self._breakers['newsapi'].allow_request():
+            return self._last_good.get('newsapi')
+        
+        try:
+            async with session.get(NEWSAPI_URL, params=self._newsapi_params(limit)) as response:
+                response.raise_for_status()
+                return self._remember('newsapi', limit, json_loads(await response.read()))
+        except Exception as e:
+            logger.error(f"NewsAPI error: {e}")
+            self._breakers['newsapi'].record_failure()
+            return self._last_good.get('newsapi')
+    
+    async def _aget_news_from_finnhub(self, session: aiohttp.ClientSession, limit: int = NEWS_LIMIT) -> Optional[Dict]:
+        """Async twin of _get_news_from_finnhub"""
+        if not self._finnhub_enabled:
+            return None
+        cached = self._source_cache.get(('finnhub', limit))
+        if cached is not None:
+            return cached
+        if not self._breakers['finnhub'].allow_request():
+            return self._last_good.get('finnhub')
+        
+        try:
+            async with session.get(FINNHUB_URL, params=self._finnhub_params()) as response:
+                response.raise_for_status()
+                return self._remember('finnhub', limit, self._convert_finnhub_articles(json_loads(await response.read()), limit))
+        except Exception as e:
+            logger.error(f"Finnhub error: {e}")
+            self._breakers['finnhub'].record_failure()
+            return self._last_good.get('finnhub')
     
     def _get_fallback_news(self) -> Dict:
         """Get fallback market news when APIs are not available"""
-        current_time = datetime.now()
+        published = iso_offsets(datetime.now(), FALLBACK_HOURS)
         
         # Sample market news (in real implementation, this would be from actual sources)
         fallback_articles = [
             {
-                'title': 'EUR/USD Steady as Markets Await Central Bank Decisions',
-                'description': 'The euro remains stable against the dollar as investors monitor upcoming central bank policy meetings and economic data releases.',
-                'url': 'https://example.com/eur-usd-analysis',
-                'publishedAt': (current_time - timedelta(hours=1)).isoformat(),
-                'source': 'Market Analysis'
-            },
-            {
-                'title': 'Gold Prices Edge Higher on Safe-Haven Demand',
-                'description': 'Gold futures advance as geopolitical tensions and economic uncertainty drive investors toward safe-haven assets.',
-                'url': 'https://example.com/gold-outlook',
-                'publishedAt': (current_time - timedelta(hours=2)).isoformat(),
-                'source': 'Commodities Report'
-            },
-            {
-                'title': 'Bitcoin Maintains Support Above $40,000',
-                'description': 'Cryptocurrency markets show resilience as Bitcoin holds key support levels amid ongoing institutional adoption.',
-                'url': 'https://example.com/crypto-update',
-                'publishedAt': (current_time - timedelta(hours=3)).isoformat(),
-                'source': 'Crypto Daily'
-            },
-            {
-                'title': 'Oil Prices Fluctuate on Supply and Demand Concerns',
-                'description': 'Crude oil futures trade mixed as market participants balance supply constraints against global demand uncertainties.',
-                'url': 'https://example.com/oil-market',
-                'publishedAt': (current_time - timedelta(hours=4)).isoformat(),
-                'source': 'Energy Markets'
-            },
-            {
-                'title': 'Stock Markets Show Cautious Optimism',
-                'description': 'Major indices advance modestly as corporate earnings season progresses and economic indicators show mixed signals.',
-                'url': 'https://example.com/stock-outlook',
-                'publishedAt': (current_time - timedelta(hours=5)).isoformat(),
-                'source': 'Equity Markets'
+                'title': title,
+                'description': description,
+                'url': url,
+                'publishedAt': published[hours_ago],
+                'source': source
             }
+            for title, description, url, hours_ago, source in FALLBACK_ARTICLES
         ]
         
         return {'articles': fallback_articles}
@@ -141,100 +552,202 @@ class MarketNews:
     def get_economic_calendar(self) -> List[Dict]:
         """Get economic events calendar (placeholder)"""
         # In a real implementation, this would fetch from economic calendar APIs
-        events = [
-            {
-                'time': '08:30',
-                'event': 'US Non-Farm Payrolls',
-                'currency': 'USD',
-                'impact': 'HIGH',
-                'forecast': '200K',
-                'previous': '180K'
-            },
-            {
-                'time': '10:00',
-                'event': 'EUR Interest Rate Decision',
-                'currency': 'EUR',
-                'impact': 'HIGH',
-                'forecast': '0.50%',
-                'previous': '0.25%'
-            },
-            {
-                'time': '14:30',
-                'event': 'Crude Oil Inventories',
-                'currency': 'USD',
-                'impact': 'MEDIUM',
-                'forecast': '-2.5M',
-                'previous': '-3.2M'
-            }
-        ]
-        return events
+        return [event.to_dict() for event in ECONOMIC_CALENDAR]
+    
+    def get_calendar_events(self) -> List[EconomicEvent]:
+        """Economic calendar as immutable records"""
+        return list(ECONOMIC_CALENDAR)
     
     def get_market_sentiment(self) -> Dict:
         """Get current market sentiment indicators"""
         # Placeholder - in real implementation, this would analyze various sentiment indicators
-        sentiment = {
-            'overall': 'NEUTRAL',
-            'risk_appetite': 'MODERATE',
-            'vix_level': 18.5,
-            'dollar_strength': 102.3,
-            'gold_trend': 'BULLISH',
-            'crypto_sentiment': 'BULLISH',
-            'forex_volatility': 'MODERATE'
-        }
-        return sentiment
+        return dict(MARKET_SENTIMENT)
     
     def get_forex_news(self, pair: str = None) -> Dict:
         """Get currency pair specific news"""
         # This would fetch pair-specific news in a real implementation
-        pair_news = {
-            'EURUSD': [
-                {
-                    'title': 'ECB Officials Signal Potential Rate Hike Pause',
-                    'impact': 'BEARISH_EUR',
-                    'time': datetime.now().isoformat()
-                },
-                {
-                    'title': 'US Dollar Strengthens on Fed Hawkish Comments',
-                    'impact': 'BEARISH_EUR',
-                    'time': (datetime.now() - timedelta(hours=2)).isoformat()
-                }
-            ],
-            'GBPUSD': [
-                {
-                    'title': 'BoE Governor Discusses Inflation Control Measures',
-                    'impact': 'BULLISH_GBP',
-                    'time': (datetime.now() - timedelta(hours=1)).isoformat()
-                }
-            ],
-            'USDJPY': [
-                {
-                    'title': 'BoJ Maintains Ultra-Loose Policy Stance',
-                    'impact': 'BULLISH_JPY',
-                    'time': (datetime.now() - timedelta(hours=3)).isoformat()
-                }
+        times = iso_offsets(datetime.now(), FOREX_NEWS_HOURS)
+        
+        def build(items):
+            return [
+                {'title': title, 'impact': impact, 'time': times[hours_ago]}
+                for title, impact, hours_ago in items
             ]
-        }
         
         if pair:
-            return {'articles': pair_news.get(pair, [])}
-        return pair_news
+            return {'articles': build(FOREX_PAIR_NEWS.get(pair, ()))}
+        return {news_pair: build(items) for news_pair, items in FOREX_PAIR_NEWS.items()}
+    
+    def get_forex_news_batch(self, pairs: List[str]) -> Dict[str, List[Dict]]:
+        """Get news for several currency pairs in one call"""
+        pair_news = self.get_forex_news()
+        return {pair: pair_news.get(pair, []) for pair in pairs}
     
     def get_breaking_news_alerts(self) -> List[Dict]:
         """Get breaking news that could impact markets"""
         # This would monitor news feeds for breaking news
-        breaking_news = [
+        alert_time = datetime.now().isoformat()
+        return [
             {
-                'headline': 'Major Economic Data Release Scheduled for Next Hour',
-                'impact': 'HIGH',
-                'assets_affected': ['EURUSD', 'GBPUSD', 'USDJPY'],
-                'alert_time': datetime.now().isoformat()
+                'headline': headline,
+                'impact': impact,
+                'assets_affected': list(assets_affected),
+                'alert_time': alert_time
             }
+            for headline, impact, assets_affected in BREAKING_NEWS
         ]
-        return breaking_news
+
+class KeywordMatcher:
+    """Finds which keywords of a fixed set occur (as substrings) in a text
+    
+    Uses an Aho-Corasick automaton (pyahocorasick) when installed, otherwise a
+    single compiled regex alternation; either way the text is scanned once for
+    all keywords.
+    """
+    
+    def __init__(self, keywords):
+        self.keywords = frozenset(keywords)
+        self._automaton = None
+        # Longest keywords first so a shorter keyword cannot shadow a longer one
+        self._pattern = re.compile('|'.join(re.escape(keyword) for keyword in sorted(self.keywords, key=len, reverse=True)))
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+    
+    def found(self, text: str) -> set:
+        """Set of keywords present in text"""
+        if self._automaton is not None:
+            return {keyword for _, keyword in self._automaton.iter(text)}
+        return set(self._pattern.findall(text))
+    
+    def count(self, text: str) -> int:
+        """Number of distinct keywords present in text"""
+        return len(self.found(text))
+    
+    def search(self, text: str) -> bool:
+        """Whether any keyword is present in text"""
+        if self._automaton is not None:
+            return next(self._automaton.iter(text), None) is not None
+        return self._pattern.search(text) is not None
+
+# Keywords for sentiment analysis
+POSITIVE_KEYWORDS = KeywordMatcher(['growth', 'increase', 'rise', 'gain', 'bull', 'positive', 'strong', 'boost', 'rally'])
+NEGATIVE_KEYWORDS = KeywordMatcher(['decline', 'decrease', 'fall', 'loss', 'bear', 'negative', 'weak', 'drop', 'crash', 'recession'])
+
+# Keywords for asset impact assessment
+ECB_TERMS = KeywordMatcher(['ecb', 'european central bank', 'euro', 'europe'])
+ECB_HAWKISH = KeywordMatcher(['hawkish', 'increase', 'raise', 'tightening'])
+ECB_DOVISH = KeywordMatcher(['dovish', 'decrease', 'cut', 'easing'])
+FED_TERMS = KeywordMatcher(['fed', 'federal reserve', 'dollar', 'us'])
+FED_HAWKISH = KeywordMatcher(['hawkish', 'increase', 'raise'])
+FED_DOVISH = KeywordMatcher(['dovish', 'decrease', 'cut'])
+GOLD_SAFE_HAVEN = KeywordMatcher(['inflation', 'uncertaint', 'crisis', 'safe-haven'])
+GOLD_PRESSURE = KeywordMatcher(['strong dollar', 'fed hawkish', 'rate increase'])
+CRYPTO_TERMS = KeywordMatcher(['bitcoin', 'crypto', 'institutional'])
+CRYPTO_BULLISH = KeywordMatcher(['adoption', 'etf', 'bullish'])
+CRYPTO_BEARISH = KeywordMatcher(['regulation', 'ban', 'negative'])
+
+# Sentiment sign per article, keyed by a hash of its title and description
+SENTIMENT_CACHE = cachetools.LRUCache(maxsize=1024)
+
+def fingerprint(text: str) -> int:
+    """Cheap 64-bit fingerprint of a string"""
+    if xxhash is not None:
+        return xxhash.xxh64_intdigest(text)
+    return hash(text)
+
+def content_hash(title: str, description: str) -> int:
+    """Fingerprint of an article's text"""
+    return fingerprint(f"{title}\x00{description}")
+
+def published_epoch(article: Dict) -> float:
+    """An article's publishedAt as epoch seconds; naive times count as UTC, bad ones sort last"""
+    try:
+        published = datetime.fromisoformat((article.get('publishedAt') or '').replace('Z', '+00:00'))
+    except ValueError:
+        return 0.0
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)
+    return published.timestamp()
+
+def merge_articles(results, limit: int) -> Optional[Dict]:
+    """Combine payloads from several sources, dropping repeated headlines
+    
+    Articles are deduplicated on their normalised title, newest first.
+    """
+    merged = {}
+    for result in results:
+        if not result or isinstance(result, BaseException):
+            continue
+        for article in result.get('articles', []):
+            key = fingerprint((article.get('title') or '').lower().strip())
+            merged.setdefault(key, article)
+    if not merged:
+        return None
+    articles = sorted(merged.values(), key=published_epoch, reverse=True)
+    return {'articles': articles[:limit]}
+
+def article_sign(title: str, description: str) -> int:
+    """+1, -1 or 0 depending on whether positive or negative keywords dominate"""
+    key = content_hash(title, description)
+    sign = SENTIMENT_CACHE.get(key)
+    if sign is None:
+        # Aggregated feeds repeat articles; only scan text we have not seen
+        text = f"{title.lower()} {description.lower()}"
+        sign = int(np.sign(POSITIVE_KEYWORDS.count(text) - NEGATIVE_KEYWORDS.count(text)))
+        SENTIMENT_CACHE[key] = sign
+    return sign
+
+# asset -> ((trigger or None, ((matcher, score, reason), ...)), ...)
+# Within a rule only the first matching matcher counts, mirroring an if/elif chain.
+EURUSD_RULES = (
+    (ECB_TERMS, ((ECB_HAWKISH, 1, 'ECB hawkish stance'), (ECB_DOVISH, -1, 'ECB dovish stance'))),
+    (FED_TERMS, ((FED_HAWKISH, -1, 'Fed hawkish stance (USD strength)'), (FED_DOVISH, 1, 'Fed dovish stance (USD weakness)')))
+)
+GOLD_RULES = (
+    (None, ((GOLD_SAFE_HAVEN, 1, 'Safe-haven demand'), (GOLD_PRESSURE, -1, 'Dollar strength pressure'))),
+)
+CRYPTO_RULES = (
+    (CRYPTO_TERMS, ((CRYPTO_BULLISH, 1, 'Crypto adoption news'), (CRYPTO_BEARISH, -1, 'Crypto regulatory concerns'))),
+)
+ASSET_IMPACT_RULES = {
+    'EURUSD': EURUSD_RULES,
+    'XAUUSD': GOLD_RULES,
+    'BTCUSD': CRYPTO_RULES,
+    'ETHUSD': CRYPTO_RULES
+}
+
+def make_asset_scorer(rules):
+    """Build a scorer that only runs the checks for one asset"""
+    def score(news_articles: List[Dict]):
+        impact_score = 0
+        reasons = []
+        for article in news_articles:
+            text = f"{article.get('title', '').lower()} {article.get('description', '').lower()}"
+            for trigger, outcomes in rules:
+                if trigger is not None and not trigger.search(text):
+                    continue
+                for matcher, delta, reason in outcomes:
+                    if matcher.search(text):
+                        impact_score += delta
+                        reasons.append(reason)
+                        break
+        return impact_score, reasons
+    return score
+
+def score_no_impact(news_articles: List[Dict]):
+    """Scorer for assets without news rules"""
+    return 0, []
+
+ASSET_SCORERS = {asset: make_asset_scorer(rules) for asset, rules in ASSET_IMPACT_RULES.items()}
 
 class NewsSentimentAnalyzer:
     """Analyzes news sentiment for market insights"""
     
+    __slots__ = ('sentiment_weights',)
+    
     def __init__(self):
         self.sentiment_weights = {
             'POSITIVE': 1.0,
@@ -247,27 +760,16 @@ class NewsSentimentAnalyzer:
         if not news_articles:
             return {'sentiment': 'NEUTRAL', 'score': 0, 'confidence': 0}
         
-        total_sentiment = 0
-        processed_count = 0
-        
-        # Keywords for sentiment analysis
-        positive_keywords = ['growth', 'increase', 'rise', 'gain', 'bull', 'positive', 'strong', 'boost', 'rally']
-        negative_keywords = ['decline', 'decrease', 'fall', 'loss', 'bear', 'negative', 'weak', 'drop', 'crash', 'recession']
+        # Pull the two fields out once, then score them as parallel columns
+        titles = [article.get('title', '') for article in news_articles]
+        descriptions = [article.get('description', '') for article in news_articles]
+        processed_count = len(titles)
         
-        for article in news_articles:
-            title = article.get('title', '').lower()
-            description = article.get('description', '').lower()
-            text = f"{title} {description}"
-            
-            positive_count = sum(1 for word in positive_keywords if word in text)
-            negative_count = sum(1 for word in negative_keywords if word in text)
-            
-            if positive_count > negative_count:
-                total_sentiment += 1
-            elif negative_count > positive_count:
-                total_sentiment -= 1
-            
-            processed_count += 1
+        # +1 / -1 / 0 per article, reduced in one go at the end
+        article_signs = np.fromiter(
+            map(article_sign, titles, descriptions), dtype=np.int8, count=processed_count
+        )
+        total_sentiment = int(article_signs.sum())
         
         if processed_count == 0:
             return {'sentiment': 'NEUTRAL', 'score': 0, 'confidence': 0}
@@ -292,48 +794,7 @@ class NewsSentimentAnalyzer:
     
     def get_asset_impact_assessment(self, news_articles: List[Dict], asset: str) -> Dict:
         """Assess how news might impact a specific asset"""
-        impact_score = 0
-        reasons = []
-        
-        for article in news_articles:
-            title = article.get('title', '').lower()
-            description = article.get('description', '').lower()
-            text = f"{title} {description}"
-            
-            # Asset-specific impact analysis
-            if asset == 'EURUSD':
-                if any(word in text for word in ['ecb', 'european central bank', 'euro', 'europe']):
-                    if any(word in text for word in ['hawkish', 'increase', 'raise', 'tightening']):
-                        impact_score += 1
-                        reasons.append('ECB hawkish stance')
-                    elif any(word in text for word in ['dovish', 'decrease', 'cut', 'easing']):
-                        impact_score -= 1
-                        reasons.append('ECB dovish stance')
-                
-                if any(word in text for word in ['fed', 'federal reserve', 'dollar', 'us']):
-                    if any(word in text for word in ['hawkish', 'increase', 'raise']):
-                        impact_score -= 1
-                        reasons.append('Fed hawkish stance (USD strength)')
-                    elif any(word in text for word in ['dovish', 'decrease', 'cut']):
-                        impact_score += 1
-                        reasons.append('Fed dovish stance (USD weakness)')
-            
-            elif asset == 'XAUUSD':  # Gold
-                if any(word in text for word in ['inflation', 'uncertaint', 'crisis', 'safe-haven']):
-                    impact_score += 1
-                    reasons.append('Safe-haven demand')
-                elif any(word in text for word in ['strong dollar', 'fed hawkish', 'rate increase']):
-                    impact_score -= 1
-                    reasons.append('Dollar strength pressure')
-            
-            elif asset in ['BTCUSD', 'ETHUSD']:  # Crypto
-                if any(word in text for word in ['bitcoin', 'crypto', 'institutional']):
-                    if any(word in text for word in ['adoption', 'etf', 'bullish']):
-                        impact_score += 1
-                        reasons.append('Crypto adoption news')
-                    elif any(word in text for word in ['regulation', 'ban', 'negative']):
-                        impact_score -= 1
-                        reasons.append('Crypto regulatory concerns')
+        impact_score, reasons = ASSET_SCORERS.get(asset, score_no_impact)(news_articles)
         
         return {
             'impact_score': impact_score,
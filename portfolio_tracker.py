@@ -3,15 +3,41 @@ Portfolio Tracker Module for Pocket Option Trading Bot
 Tracks trading performance, win rates, and portfolio metrics
 """
 
+import csv
 import json
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import logging
-import pandas as pd
-from dataclasses import dataclass, asdict
+import numpy as np
+from dataclasses import dataclass, field
 from enum import Enum
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pc = None
+    pacsv = None
+    pq = None
+
 logger = logging.getLogger(__name__)
 
 class TradeStatus(Enum):
@@ -26,7 +52,7 @@ class TradeType(Enum):
     BUY = "buy"
     SELL = "sell"
 
-@dataclass
+@dataclass(slots=True)
 class Trade:
     """Trade data class"""
     id: str
@@ -44,10 +70,41 @@ class Trade:
     confidence: int
     signal_reasons: List[str]
     timeframe: str
+    # (entry_time, entry ISO, exit_time, exit ISO) memo, see iso_times()
+    _iso_times: Tuple = field(default=(None, None, None, None), init=False, repr=False, compare=False)
     
     def to_dict(self) -> Dict:
-        """Convert trade to dictionary"""
-        return asdict(self)
+        """Convert trade to dictionary
+        
+        Built by hand rather than with dataclasses.asdict, which deep-copies every
+        field on each save; signal_reasons is shared, not copied.
+        """
+        return {
+            'id': self.id,
+            'symbol': self.symbol,
+            'trade_type': self.trade_type,
+            'entry_price': self.entry_price,
+            'exit_price': self.exit_price,
+            'quantity': self.quantity,
+            'entry_time': self.entry_time,
+            'exit_time': self.exit_time,
+            'status': self.status,
+            'stop_loss': self.stop_loss,
+            'take_profit': self.take_profit,
+            'profit_loss': self.profit_loss,
+            'confidence': self.confidence,
+            'signal_reasons': self.signal_reasons,
+            'timeframe': self.timeframe
+        }
+    
+    def iso_times(self) -> Tuple[str, Optional[str]]:
+        """ISO strings for entry and exit time, formatted again only after either changes"""
+        entry_time, entry_iso, exit_time, exit_iso = self._iso_times
+        if entry_time is not self.entry_time or exit_time is not self.exit_time:
+            entry_iso = self.entry_time.isoformat()
+            exit_iso = self.exit_time.isoformat() if self.exit_time else None
+            self._iso_times = (self.entry_time, entry_iso, self.exit_time, exit_iso)
+        return entry_iso, exit_iso
     
     @classmethod
     def from_dict(cls, data: Dict) -> 'Trade':
@@ -64,58 +121,536 @@ class Trade:
         
         return cls(**data)
 
+# Integer codes used for trade status in the columnar arrays
+STATUS_OPEN, STATUS_WIN, STATUS_LOSS, STATUS_BREAKEVEN = range(4)
+STATUS_CODES = {
+    TradeStatus.OPEN: STATUS_OPEN,
+    TradeStatus.CLOSED_WIN: STATUS_WIN,
+    TradeStatus.CLOSED_LOSS: STATUS_LOSS,
+    TradeStatus.CLOSED_BREAKEVEN: STATUS_BREAKEVEN
+}
+NO_EXIT_NS = np.iinfo(np.int64).min  # exit time of trades that have not been closed
+NS_PER_HOUR = 3_600_000_000_000
+NS_PER_DAY = 24 * NS_PER_HOUR
+
+def jit(func):
+    """Compile a kernel with Numba when it is installed, else run it as plain Python"""
+    return njit(cache=True)(func) if njit is not None else func
+
+@jit
+def consecutive_wins(status, pnl):
+    """Length of the current winning streak, scanning back from the newest trade"""
+    count = 0
+    for i in range(status.size - 1, -1, -1):
+        if status[i] == STATUS_WIN and pnl[i] > 0:
+            count += 1
+        elif status[i] == STATUS_LOSS or status[i] == STATUS_BREAKEVEN:
+            break
+    return count
+
+@jit
+def consecutive_losses(status, pnl):
+    """Length of the current losing streak, scanning back from the newest trade"""
+    count = 0
+    for i in range(status.size - 1, -1, -1):
+        if status[i] == STATUS_LOSS and pnl[i] < 0:
+            count += 1
+        elif status[i] == STATUS_WIN or status[i] == STATUS_BREAKEVEN:
+            break
+    return count
+
+@jit
+def max_consecutive_losses(pnl):
+    """Longest run of losing trades"""
+    longest = 0
+    current = 0
+    for i in range(pnl.size):
+        if pnl[i] < 0:
+            current += 1
+            if current > longest:
+                longest = current
+        else:
+            current = 0
+    return longest
+
+@jit
+def aggregate_closed(pnl, status, entry_ns, exit_ns, cutoff_ns):
+    """Every statistic over trades closed since cutoff_ns, in a single pass
+    
+    Returns (closed, wins, losses, total profit, total loss, largest win,
+    largest loss, duration sum in ns, durations counted).
+    """
+    closed = 0
+    wins = 0
+    losses = 0
+    total_profit = 0.0
+    total_loss = 0.0
+    largest_win = 0.0
+    largest_loss = 0.0
+    duration_ns = 0
+    duration_count = 0
+    for i in range(pnl.size):
+        if status[i] == STATUS_OPEN or exit_ns[i] < cutoff_ns:
+            continue
+        closed += 1
+        p = pnl[i]
+        if p > 0:
+            wins += 1
+            total_profit += p
+            if p > largest_win:
+                largest_win = p
+        elif p < 0:
+            losses += 1
+            total_loss += p
+            if p < largest_loss:
+                largest_loss = p
+        d = exit_ns[i] - entry_ns[i]
+        if d != 0:
+            duration_ns += d
+            duration_count += 1
+    return closed, wins, losses, total_profit, total_loss, largest_win, largest_loss, duration_ns, duration_count
+
+if njit is not None:
+    # Compile (or load from cache) now so the first real call is not slow
+    aggregate_closed(np.zeros(1), np.zeros(1, dtype=np.int8), np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64), 0)
+    consecutive_wins(np.zeros(1, dtype=np.int8), np.zeros(1))
+    consecutive_losses(np.zeros(1, dtype=np.int8), np.zeros(1))
+    max_consecutive_losses(np.zeros(1))
+
+def to_ns(moment: datetime) -> int:
+    """Convert a datetime to integer nanoseconds since the epoch"""
+    return int(moment.timestamp() * 1_000_000) * 1000
+
+@dataclass
+class TradeTotals:
+    """All-time aggregates over closed trades, updated as each trade closes"""
+    closed: int = 0
+    win_count: int = 0
+    loss_count: int = 0
+    total_profit: float = 0.0
+    total_loss: float = 0.0
+    largest_win: float = 0.0
+    largest_loss: float = 0.0
+    duration_ns: int = 0
+    duration_count: int = 0
+    
+    @classmethod
+    def from_columns(cls, pnl: np.ndarray, status: np.ndarray, entry_ns: np.ndarray, exit_ns: np.ndarray) -> 'TradeTotals':
+        """Aggregate a whole history at once, e.g. after loading"""
+        closed = (status != STATUS_OPEN) & (exit_ns != NO_EXIT_NS)
+        pnl = pnl[closed]
+        wins = pnl[pnl > 0]
+        losses = pnl[pnl < 0]
+        durations = exit_ns[closed] - entry_ns[closed]
+        durations = durations[durations != 0]
+        return cls(
+            closed=int(pnl.size),
+            win_count=int(wins.size),
+            loss_count=int(losses.size),
+            total_profit=float(wins.sum()),
+            total_loss=float(losses.sum()),
+            largest_win=float(wins.max(initial=0)),
+            largest_loss=float(losses.min(initial=0)),
+            duration_ns=int(durations.sum()),
+            duration_count=int(durations.size)
+        )
+    
+    def add(self, pnl: float, duration_ns: int):
+        self.closed += 1
+        if pnl > 0:
+            self.win_count += 1
+            self.total_profit += pnl
+            self.largest_win = max(self.largest_win, pnl)
+        elif pnl < 0:
+            self.loss_count += 1
+            self.total_loss += pnl
+            self.largest_loss = min(self.largest_loss, pnl)
+        if duration_ns != 0:
+            self.duration_ns += duration_ns
+            self.duration_count += 1
+
+class TradeColumns:
+    """Columnar (struct-of-arrays) mirror of the trade list for vectorized statistics
+    
+    Row ``i`` always describes ``PortfolioTracker.trades[i]``. Buffers grow
+    geometrically, and the properties expose only the filled part.
+    """
+    
+    def __init__(self, capacity: int = 64):
+        self.size = 0
+        self._pnl = np.zeros(capacity, dtype=np.float64)
+        self._status = np.zeros(capacity, dtype=np.int8)
+        self._symbol = np.zeros(capacity, dtype=np.int32)
+        self._timeframe = np.zeros(capacity, dtype=np.int32)
+        self._entry_ns = np.zeros(capacity, dtype=np.int64)
+        self._exit_ns = np.full(capacity, NO_EXIT_NS, dtype=np.int64)
+        self.symbol_codes: Dict[str, int] = {}
+        self.timeframe_codes: Dict[str, int] = {}
+        self._entry_index = None  # (sorted entry_ns, row order), rebuilt after appends
+        self.totals = TradeTotals()
+    
+    @classmethod
+    def from_trades(cls, trades: List[Trade]) -> 'TradeColumns':
+        """Build every column in one pass each, rather than appending row by row"""
+        n = len(trades)
+        columns = cls(max(64, n))
+        if not n:
+            return columns
+        
+        symbol_codes = columns.symbol_codes
+        timeframe_codes = columns.timeframe_codes
+        columns._pnl[:n] = np.fromiter((t.profit_loss or 0.0 for t in trades), dtype=np.float64, count=n)
+        columns._status[:n] = np.fromiter((STATUS_CODES[t.status] for t in trades), dtype=np.int8, count=n)
+        columns._symbol[:n] = np.fromiter(
+            (symbol_codes.setdefault(t.symbol, len(symbol_codes)) for t in trades), dtype=np.int32, count=n
+        )
+        columns._timeframe[:n] = np.fromiter(
+            (timeframe_codes.setdefault(t.timeframe, len(timeframe_codes)) for t in trades), dtype=np.int32, count=n
+        )
+        columns._entry_ns[:n] = np.fromiter((to_ns(t.entry_time) for t in trades), dtype=np.int64, count=n)
+        columns._exit_ns[:n] = np.fromiter(
+            (to_ns(t.exit_time) if t.exit_time else NO_EXIT_NS for t in trades), dtype=np.int64, count=n
+        )
+        columns.size = n
+        columns.totals = TradeTotals.from_columns(columns.pnl, columns.status, columns.entry_ns, columns.exit_ns)
+        return columns
+    
+    def _grow(self):
+        capacity = len(self._pnl) * 2
+        for name in ('_pnl', '_status', '_symbol', '_timeframe', '_entry_ns'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+        exit_ns = np.full(capacity, NO_EXIT_NS, dtype=np.int64)
+        exit_ns[:self.size] = self._exit_ns[:self.size]
+        self._exit_ns = exit_ns
+    
+    def append(self, trade: Trade):
+        if self.size == len(self._pnl):
+            self._grow()
+        row = self.size
+        self.size += 1
+        self._symbol[row] = self.symbol_codes.setdefault(trade.symbol, len(self.symbol_codes))
+        self._timeframe[row] = self.timeframe_codes.setdefault(trade.timeframe, len(self.timeframe_codes))
+        self._entry_ns[row] = to_ns(trade.entry_time)
+        self._entry_index = None
+        self.update(row, trade)
+    
+    def update(self, row: int, trade: Trade):
+        """Refresh the mutable fields of a row after its trade changed"""
+        was_open = self._status[row] == STATUS_OPEN  # new rows start out as open
+        self._pnl[row] = trade.profit_loss or 0.0
+        self._status[row] = STATUS_CODES[trade.status]
+        self._exit_ns[row] = to_ns(trade.exit_time) if trade.exit_time else NO_EXIT_NS
+        
+        # Trades only ever close once, so each one is counted exactly once
+        if was_open and self._status[row] != STATUS_OPEN and trade.exit_time:
+            self.totals.add(float(self._pnl[row]), int(self._exit_ns[row] - self._entry_ns[row]))
+    
+    @property
+    def pnl(self) -> np.ndarray:
+        return self._pnl[:self.size]
+    
+    @property
+    def status(self) -> np.ndarray:
+        return self._status[:self.size]
+    
+    @property
+    def symbol(self) -> np.ndarray:
+        return self._symbol[:self.size]
+    
+    @property
+    def timeframe(self) -> np.ndarray:
+        return self._timeframe[:self.size]
+    
+    @property
+    def entry_ns(self) -> np.ndarray:
+        return self._entry_ns[:self.size]
+    
+    @property
+    def exit_ns(self) -> np.ndarray:
+        return self._exit_ns[:self.size]
+    
+    def entered_between(self, start_ns: int, end_ns: int) -> np.ndarray:
+        """Rows whose entry time falls in [start_ns, end_ns), via binary search"""
+        if self._entry_index is None:
+            order = np.argsort(self.entry_ns, kind='stable')
+            self._entry_index = (self.entry_ns[order], order)
+        sorted_ns, order = self._entry_index
+        lo, hi = np.searchsorted(sorted_ns, (start_ns, end_ns))
+        return order[lo:hi]
+    
+    def closed_mask(self, days: int) -> np.ndarray:
+        """Rows of trades closed within the last ``days`` days"""
+        cutoff_ns = time.time_ns() - days * NS_PER_DAY
+        return (self.status != STATUS_OPEN) & (self.exit_ns >= cutoff_ns)
+
+LOG_COMPACT_EVERY = 1000  # log records before the snapshot is rewritten
+CSV_HEADER = (
+    'ID', 'Symbol', 'Type', 'Entry Price', 'Exit Price', 'Quantity', 'Entry Time', 'Exit Time',
+    'Status', 'Stop Loss', 'Take Profit', 'Profit/Loss', 'Confidence', 'Timeframe', 'Signal Reasons'
+)
+# trades_to_table() column behind each CSV_HEADER entry
+CSV_COLUMNS = (
+    'id', 'symbol', 'trade_type', 'entry_price', 'exit_price', 'quantity', 'entry_time', 'exit_time',
+    'status', 'stop_loss', 'take_profit', 'profit_loss', 'confidence', 'timeframe', 'signal_reasons'
+)
+STATS_CACHE_TTL = 60  # seconds; windowed stats also age as time passes, not just on writes
+
+def dumps(obj) -> bytes:
+    """Serialize to compact JSON bytes, with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj).encode()
+
+def loads(data):
+    """Parse JSON from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def trade_record(trade: Trade) -> Dict:
+    """JSON-ready dict for a trade"""
+    record = trade.to_dict()
+    if orjson is not None:
+        return record  # orjson encodes enums and datetimes natively, in C
+    record['trade_type'] = trade.trade_type.value
+    record['status'] = trade.status.value
+    record['entry_time'], record['exit_time'] = trade.iso_times()
+    return record
+
+def trades_to_table(trades: List[Trade], daily_stats: Dict) -> 'pa.Table':
+    """Columnar Arrow table of trades; enums are dictionary-encoded, times stay native"""
+    table = pa.table({
+        'id': pa.array([t.id for t in trades], type=pa.string()),
+        'symbol': pa.array([t.symbol for t in trades], type=pa.string()).dictionary_encode(),
+        'trade_type': pa.array([t.trade_type.value for t in trades], type=pa.string()).dictionary_encode(),
+        'entry_price': pa.array([t.entry_price for t in trades], type=pa.float64()),
+        'exit_price': pa.array([t.exit_price for t in trades], type=pa.float64()),
+        'quantity': pa.array([t.quantity for t in trades], type=pa.float64()),
+        'entry_time': pa.array([t.entry_time for t in trades], type=pa.timestamp('us')),
+        'exit_time': pa.array([t.exit_time for t in trades], type=pa.timestamp('us')),
+        'status': pa.array([t.status.value for t in trades], type=pa.string()).dictionary_encode(),
+        'stop_loss': pa.array([t.stop_loss for t in trades], type=pa.float64()),
+        'take_profit': pa.array([t.take_profit for t in trades], type=pa.float64()),
+        'profit_loss': pa.array([t.profit_loss for t in trades], type=pa.float64()),
+        'confidence': pa.array([t.confidence for t in trades], type=pa.int32()),
+        'signal_reasons': pa.array([t.signal_reasons for t in trades], type=pa.list_(pa.string())),
+        'timeframe': pa.array([t.timeframe for t in trades], type=pa.string()).dictionary_encode()
+    })
+    return table.replace_schema_metadata({'daily_stats': dumps(daily_stats)})
+
 class PortfolioTracker:
-    """Advanced portfolio tracking system"""
+    """Advanced portfolio tracking system
+    
+    Trades are stored as JSON, or as a zstd-compressed Parquet file when
+    ``data_file`` ends in ``.parquet`` (requires pyarrow). New and closed
+    trades are appended to ``<data_file>.log`` and replayed on load; the
+    snapshot itself is only rewritten every ``LOG_COMPACT_EVERY`` records,
+    atomically via a temporary file. Log writes happen on a background
+    thread and are fsynced every ``fsync_every`` records; call ``flush()``
+    to wait for them.
+    """
     
-    def __init__(self, data_file: str = "portfolio_data.json"):
+    def __init__(self, data_file: str = "portfolio_data.json", fsync_every: int = 10):
         self.data_file = data_file
+        self.log_file = data_file + '.log'
+        self.fsync_every = max(1, fsync_every)
+        self._log_records = 0  # records logged since the last snapshot (caller thread)
+        self._log_failed = False
+        self._unsynced = 0
+        self._io_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='portfolio-io')
+        self._io_lock = threading.Lock()
+        self._parquet = data_file.endswith('.parquet')
+        if self._parquet and pq is None:
+            raise ImportError("pyarrow is required for Parquet portfolio storage")
         self.trades: List[Trade] = []
-        self.daily_stats = {}
+        self.daily_stats: OrderedDict = OrderedDict()  # date string -> stats, oldest first
+        self._cols = TradeColumns()
+        self._version = 0  # bumped on every change to the trades
+        self._stats_cache: Dict[tuple, Dict] = {}
+        self._stats_bucket = None
         self.load_data()
     
     def load_data(self):
         """Load portfolio data from file"""
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
+            if os.path.exists(self.data_file) and self._parquet:
+                table = pq.read_table(self.data_file)
+                self.trades = [Trade.from_dict(trade_data) for trade_data in table.to_pylist()]
+                metadata = table.schema.metadata or {}
+                self.daily_stats = loads(metadata.get(b'daily_stats', b'{}'))
+                logger.info(f"Loaded {len(self.trades)} trades from {self.data_file}")
+            elif os.path.exists(self.data_file):
+                with open(self.data_file, 'rb') as f:
+                    data = loads(f.read())
                     self.trades = [Trade.from_dict(trade_data) for trade_data in data.get('trades', [])]
                     self.daily_stats = data.get('daily_stats', {})
                 logger.info(f"Loaded {len(self.trades)} trades from {self.data_file}")
             else:
                 logger.info("No existing portfolio data found, starting fresh")
+            
+            touched_days = self._replay_log()
+            self._cols = TradeColumns.from_trades(self.trades)
+            self._bump_version()
+            for day in touched_days:
+                self.daily_stats[day.strftime('%Y-%m-%d')] = self.get_daily_performance(day)
+            self.daily_stats = OrderedDict(sorted(self.daily_stats.items()))
+            if touched_days:
+                self.update_daily_stats()
         except Exception as e:
             logger.error(f"Error loading portfolio data: {e}")
             self.trades = []
-            self.daily_stats = {}
+            self.daily_stats = OrderedDict()
+            self._cols = TradeColumns()
+            self._bump_version()
     
-    def save_data(self):
-        """Save portfolio data to file"""
+    def _bump_version(self):
+        """Invalidate memoized statistics after the trades changed"""
+        self._version += 1
+        self._stats_cache.clear()
+    
+    def _memo(self, key: tuple, compute, *args) -> Dict:
+        """Return a copy of compute(*args), cached per trade version and time bucket"""
+        bucket = int(time.time() // STATS_CACHE_TTL)
+        if bucket != self._stats_bucket:
+            self._stats_cache.clear()
+            self._stats_bucket = bucket
+        key = key + (self._version,)
+        result = self._stats_cache.get(key)
+        if result is None:
+            result = self._stats_cache[key] = compute(*args)
+        return dict(result)
+    
+    def _replay_log(self) -> List[datetime]:
+        """Apply trade log records written since the last snapshot
+        
+        Returns the entry times of the trades that changed, so their daily
+        stats can be refreshed.
+        """
+        if not os.path.exists(self.log_file):
+            return []
+        
+        by_id = {trade.id: trade for trade in self.trades}
+        touched = []
+        with open(self.log_file, 'rb') as f:
+            for line in f:
+                try:
+                    record = loads(line)
+                except ValueError:
+                    logger.warning(f"Ignoring incomplete record at the end of {self.log_file}")
+                    break
+                self._log_records += 1
+                
+                if record['op'] == 'add':
+                    if record['trade']['id'] in by_id:
+                        continue  # already part of the snapshot
+                    trade = Trade.from_dict(record['trade'])
+                    self.trades.append(trade)
+                    by_id[trade.id] = trade
+                else:
+                    trade = by_id.get(record['id'])
+                    if trade is None or trade.status != TradeStatus.OPEN:
+                        continue
+                    trade.exit_price = record['exit_price']
+                    trade.exit_time = datetime.fromisoformat(record['exit_time'])
+                    trade.status = TradeStatus(record['status'])
+                    trade.profit_loss = record['profit_loss']
+                touched.append(trade.entry_time)
+        
+        logger.info(f"Replayed {self._log_records} records from {self.log_file}")
+        return touched
+    
+    def _append_log(self, record: Dict):
+        """Queue one record for the trade log without blocking the caller"""
+        # Serialize now so the record reflects the trade as it is at this moment
+        self._io_pool.submit(self._write_log, dumps(record) + b'\n')
+        self._log_records += 1
+        if self._log_records >= LOG_COMPACT_EVERY or self._log_failed:
+            # Snapshot here, on the thread that mutates the trades, so it never
+            # captures a half-updated trade; only the write runs in the background
+            self._log_failed = False
+            self._io_pool.submit(self._write_snapshot, self._snapshot())
+    
+    def _write_log(self, line: bytes):
+        """Append a serialized record to the trade log (I/O thread)"""
         try:
-            data = {
-                'trades': [trade.to_dict() for trade in self.trades],
-                'daily_stats': self.daily_stats,
-                'last_updated': datetime.now().isoformat()
-            }
-            
-            # Convert datetime objects to strings for JSON serialization
-            for trade_dict in data['trades']:
-                trade_dict['entry_time'] = trade_dict['entry_time'].isoformat()
-                if trade_dict['exit_time']:
-                    trade_dict['exit_time'] = trade_dict['exit_time'].isoformat()
-            
-            with open(self.data_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            with self._io_lock:
+                with open(self.log_file, 'ab') as f:
+                    f.write(line)
+                    self._unsynced += 1
+                    if self._unsynced >= self.fsync_every:
+                        f.flush()
+                        os.fsync(f.fileno())
+                        self._unsynced = 0
+        except Exception as e:
+            logger.error(f"Error writing portfolio log: {e}")
+            self._log_failed = True  # the next change writes a full snapshot
+    
+    def flush(self):
+        """Block until every queued log write has reached the file"""
+        self._io_pool.submit(lambda: None).result()
+    
+    def close(self):
+        """Finish pending writes and stop the I/O thread"""
+        self._io_pool.shutdown(wait=True)
+    
+    def _truncate_log(self):
+        """Drop log records already contained in the snapshot"""
+        if os.path.exists(self.log_file):
+            os.remove(self.log_file)
+        self._unsynced = 0
+    
+    def _snapshot(self):
+        """Serialize the current trades and daily stats for _write_snapshot"""
+        self._log_records = 0
+        if self._parquet:
+            return trades_to_table(self.trades, dict(self.daily_stats))
+        return dumps({
+            'trades': [trade_record(trade) for trade in self.trades],
+            'daily_stats': self.daily_stats,
+            'last_updated': datetime.now().isoformat()
+        })
+    
+    def _write_snapshot(self, snapshot):
+        """Write a snapshot atomically and truncate the log it supersedes (I/O thread)"""
+        tmp_file = self.data_file + '.tmp'
+        try:
+            with self._io_lock:
+                if self._parquet:
+                    pq.write_table(snapshot, tmp_file, compression='zstd')
+                    with open(tmp_file, 'rb') as f:
+                        os.fsync(f.fileno())
+                else:
+                    with open(tmp_file, 'wb') as f:
+                        f.write(snapshot)
+                        f.flush()
+                        os.fsync(f.fileno())
+                
+                os.replace(tmp_file, self.data_file)
+                self._truncate_log()
             
             logger.info(f"Portfolio data saved to {self.data_file}")
         except Exception as e:
             logger.error(f"Error saving portfolio data: {e}")
     
+    def save_data(self):
+        """Save portfolio data to file
+        
+        The snapshot is written to ``<data_file>.tmp``, fsynced and then moved
+        into place, so a crash mid-write never leaves a truncated file behind.
+        The write is queued behind pending log records and waited for.
+        """
+        self._io_pool.submit(self._write_snapshot, self._snapshot()).result()
+    
     def add_trade(self, trade: Trade):
         """Add a new trade to the portfolio"""
         self.trades.append(trade)
+        self._cols.append(trade)
+        self._bump_version()
         self.update_daily_stats()
-        self.save_data()
+        self._append_log({'op': 'add', 'trade': trade_record(trade)})
         logger.info(f"Added trade: {trade.symbol} {trade.trade_type.value} at {trade.entry_price}")
     
     def close_trade(self, trade_id: str, exit_price: float, exit_time: Optional[datetime] = None) -> bool:
@@ -123,8 +658,10 @@ class PortfolioTracker:
         if exit_time is None:
             exit_time = datetime.now()
         
-        for trade in self.trades:
-            if trade.id == trade_id and trade.status == TradeStatus.OPEN:
+        # Only open rows can match, so compare ids against those alone
+        for row in np.flatnonzero(self._cols.status == STATUS_OPEN):
+            trade = self.trades[row]
+            if trade.id == trade_id:
                 trade.exit_price = exit_price
                 trade.exit_time = exit_time
                 trade.status = TradeStatus.CLOSED_WIN if exit_price > trade.entry_price else TradeStatus.CLOSED_LOSS
@@ -135,8 +672,17 @@ class PortfolioTracker:
                 else:
                     trade.profit_loss = (trade.entry_price - exit_price) * trade.quantity
                 
+                self._cols.update(row, trade)
+                self._bump_version()
                 self.update_daily_stats()
-                self.save_data()
+                self._append_log({
+                    'op': 'close',
+                    'id': trade.id,
+                    'exit_price': exit_price,
+                    'exit_time': trade.iso_times()[1],
+                    'status': trade.status.value,
+                    'profit_loss': trade.profit_loss
+                })
                 logger.info(f"Closed trade {trade_id}: P&L = ${trade.profit_loss:.2f}")
                 return True
         
@@ -145,21 +691,58 @@ class PortfolioTracker:
     
     def get_open_trades(self) -> List[Trade]:
         """Get all open trades"""
-        return [trade for trade in self.trades if trade.status == TradeStatus.OPEN]
+        trades = self.trades
+        return [trades[row] for row in np.flatnonzero(self._cols.status == STATUS_OPEN)]
     
     def get_closed_trades(self, days: int = 30) -> List[Trade]:
         """Get closed trades within specified days"""
-        cutoff_date = datetime.now() - timedelta(days=days)
-        return [
-            trade for trade in self.trades 
-            if trade.status != TradeStatus.OPEN and trade.exit_time and trade.exit_time >= cutoff_date
-        ]
+        trades = self.trades
+        return [trades[row] for row in np.flatnonzero(self._cols.closed_mask(days))]
     
-    def get_trade_statistics(self, days: int = 30) -> Dict:
-        """Calculate comprehensive trade statistics"""
-        closed_trades = self.get_closed_trades(days)
+    def get_trade_statistics(self, days: Optional[int] = 30) -> Dict:
+        """Calculate comprehensive trade statistics (``days=None`` for all time)"""
+        return self._memo(('stats', days), self._compute_trade_statistics, days)
+    
+    def _compute_trade_statistics(self, days: Optional[int]) -> Dict:
+        if days is None:
+            # All-time figures are maintained incrementally as trades close
+            totals = self._cols.totals
+            return self._format_statistics(
+                totals.closed, totals.win_count, totals.loss_count,
+                totals.total_profit, totals.total_loss, totals.largest_win, totals.largest_loss,
+                totals.duration_ns, totals.duration_count
+            )
+        
+        cols = self._cols
+        if njit is not None:
+            # Compiled kernel: one fused scan instead of several masked passes
+            cutoff_ns = time.time_ns() - days * NS_PER_DAY
+            aggregates = aggregate_closed(cols.pnl, cols.status, cols.entry_ns, cols.exit_ns, cutoff_ns)
+            closed, wins, losses, total_profit, total_loss, largest_win, largest_loss, duration_ns, duration_count = aggregates
+            return self._format_statistics(
+                int(closed), int(wins), int(losses),
+                float(total_profit), float(total_loss), float(largest_win), float(largest_loss),
+                int(duration_ns), int(duration_count)
+            )
         
-        if not closed_trades:
+        closed = cols.closed_mask(days)
+        pnl = cols.pnl[closed]
+        wins = pnl[pnl > 0]
+        losses = pnl[pnl < 0]
+        durations = cols.exit_ns[closed] - cols.entry_ns[closed]
+        durations = durations[durations != 0]
+        
+        return self._format_statistics(
+            int(pnl.size), int(wins.size), int(losses.size),
+            float(wins.sum()), float(losses.sum()), float(wins.max(initial=0)), float(losses.min(initial=0)),
+            int(durations.sum()), int(durations.size)
+        )
+    
+    def _format_statistics(self, total_trades: int, win_count: int, loss_count: int,
+                           total_profit: float, total_loss: float, largest_win: float, largest_loss: float,
+                           duration_ns: int, duration_count: int) -> Dict:
+        """Turn raw aggregates over closed trades into the statistics report"""
+        if not total_trades:
             return {
                 'total_trades': 0,
                 'win_rate': 0,
@@ -172,33 +755,19 @@ class PortfolioTracker:
                 'avg_trade_duration': 0
             }
         
-        winning_trades = [t for t in closed_trades if t.profit_loss and t.profit_loss > 0]
-        losing_trades = [t for t in closed_trades if t.profit_loss and t.profit_loss < 0]
-        
-        total_profit = sum(t.profit_loss for t in winning_trades if t.profit_loss) or 0
-        total_loss = sum(t.profit_loss for t in losing_trades if t.profit_loss) or 0
-        
-        win_rate = (len(winning_trades) / len(closed_trades)) * 100 if closed_trades else 0
-        avg_win = total_profit / len(winning_trades) if winning_trades else 0
-        avg_loss = total_loss / len(losing_trades) if losing_trades else 0
-        largest_win = max((t.profit_loss for t in winning_trades if t.profit_loss), default=0)
-        largest_loss = min((t.profit_loss for t in losing_trades if t.profit_loss), default=0)
+        win_rate = (win_count / total_trades) * 100
+        avg_win = total_profit / win_count if win_count else 0
+        avg_loss = total_loss / loss_count if loss_count else 0
         
         profit_factor = abs(total_profit / total_loss) if total_loss != 0 else float('inf') if total_profit > 0 else 0
         
-        # Calculate average trade duration
-        durations = []
-        for trade in closed_trades:
-            if trade.exit_time and trade.exit_time != trade.entry_time:
-                duration = (trade.exit_time - trade.entry_time).total_seconds() / 3600  # in hours
-                durations.append(duration)
-        
-        avg_duration = sum(durations) / len(durations) if durations else 0
+        # Average trade duration in hours
+        avg_duration = duration_ns / duration_count / NS_PER_HOUR if duration_count else 0
         
         return {
-            'total_trades': len(closed_trades),
-            'winning_trades': len(winning_trades),
-            'losing_trades': len(losing_trades),
+            'total_trades': total_trades,
+            'winning_trades': win_count,
+            'losing_trades': loss_count,
             'win_rate': round(win_rate, 2),
             'total_profit_loss': round(total_profit + total_loss, 2),
             'total_profit': round(total_profit, 2),
@@ -215,79 +784,75 @@ class PortfolioTracker:
     
     def _get_consecutive_wins(self) -> int:
         """Get current consecutive wins streak"""
-        consecutive = 0
-        for trade in reversed(self.trades):
-            if trade.status == TradeStatus.CLOSED_WIN and trade.profit_loss and trade.profit_loss > 0:
-                consecutive += 1
-            elif trade.status in [TradeStatus.CLOSED_LOSS, TradeStatus.CLOSED_BREAKEVEN]:
-                break
-        return consecutive
+        return int(consecutive_wins(self._cols.status, self._cols.pnl))
     
     def _get_consecutive_losses(self) -> int:
         """Get current consecutive losses streak"""
-        consecutive = 0
-        for trade in reversed(self.trades):
-            if trade.status == TradeStatus.CLOSED_LOSS and trade.profit_loss and trade.profit_loss < 0:
-                consecutive += 1
-            elif trade.status in [TradeStatus.CLOSED_WIN, TradeStatus.CLOSED_BREAKEVEN]:
-                break
-        return consecutive
+        return int(consecutive_losses(self._cols.status, self._cols.pnl))
     
     def get_symbol_performance(self, symbol: str, days: int = 30) -> Dict:
         """Get performance statistics for a specific symbol"""
-        symbol_trades = [
-            trade for trade in self.get_closed_trades(days)
-            if trade.symbol == symbol
-        ]
-        
-        if not symbol_trades:
-            return {
-                'symbol': symbol,
-                'total_trades': 0,
-                'win_rate': 0,
-                'profit_loss': 0
-            }
-        
-        winning_trades = [t for t in symbol_trades if t.profit_loss and t.profit_loss > 0]
-        win_rate = (len(winning_trades) / len(symbol_trades)) * 100
-        total_pnl = sum(t.profit_loss for t in symbol_trades if t.profit_loss) or 0
-        
-        return {
-            'symbol': symbol,
-            'total_trades': len(symbol_trades),
-            'winning_trades': len(winning_trades),
-            'win_rate': round(win_rate, 2),
-            'profit_loss': round(total_pnl, 2),
-            'avg_trade_pnl': round(total_pnl / len(symbol_trades), 2) if symbol_trades else 0
-        }
+        return self._group_lookup('symbol', symbol, days)
+    
+    def get_all_symbol_performance(self, days: int = 30) -> Dict[str, Dict]:
+        """Get performance statistics for every traded symbol in one pass"""
+        return self._group_performance('symbol', days)
     
     def get_timeframe_performance(self, timeframe: str, days: int = 30) -> Dict:
         """Get performance statistics for a specific timeframe"""
-        tf_trades = [
-            trade for trade in self.get_closed_trades(days)
-            if trade.timeframe == timeframe
-        ]
-        
-        if not tf_trades:
+        return self._group_lookup('timeframe', timeframe, days)
+    
+    def get_all_timeframe_performance(self, days: int = 30) -> Dict[str, Dict]:
+        """Get performance statistics for every traded timeframe in one pass"""
+        return self._group_performance('timeframe', days)
+    
+    def _group_lookup(self, field: str, name: str, days: int) -> Dict:
+        performance = self._group_performance(field, days).get(name)
+        if performance is None:
             return {
-                'timeframe': timeframe,
+                field: name,
                 'total_trades': 0,
                 'win_rate': 0,
                 'profit_loss': 0
             }
+        return performance
+    
+    def _group_performance(self, field: str, days: int) -> Dict[str, Dict]:
+        groups = self._memo((field + 's', days), self._compute_group_performance, field, days)
+        return {name: dict(performance) for name, performance in groups.items()}
+    
+    def _compute_group_performance(self, field: str, days: int) -> Dict[str, Dict]:
+        """Aggregate closed trades per symbol/timeframe code with a sort and reduceat"""
+        cols = self._cols
+        column = cols.symbol if field == 'symbol' else cols.timeframe
+        code_map = cols.symbol_codes if field == 'symbol' else cols.timeframe_codes
+        selected = cols.closed_mask(days)
+        codes = column[selected]
+        if not len(codes):
+            return {}
         
-        winning_trades = [t for t in tf_trades if t.profit_loss and t.profit_loss > 0]
-        win_rate = (len(winning_trades) / len(tf_trades)) * 100
-        total_pnl = sum(t.profit_loss for t in tf_trades if t.profit_loss) or 0
+        order = np.argsort(codes, kind='stable')
+        sorted_codes = codes[order]
+        sorted_pnl = cols.pnl[selected][order]
+        starts = np.flatnonzero(np.diff(sorted_codes, prepend=-1))
+        counts = np.diff(np.append(starts, len(sorted_codes)))
+        sums = np.add.reduceat(sorted_pnl, starts)
+        wins = np.add.reduceat((sorted_pnl > 0).astype(np.int64), starts)
         
-        return {
-            'timeframe': timeframe,
-            'total_trades': len(tf_trades),
-            'winning_trades': len(winning_trades),
-            'win_rate': round(win_rate, 2),
-            'profit_loss': round(total_pnl, 2),
-            'avg_trade_pnl': round(total_pnl / len(tf_trades), 2) if tf_trades else 0
-        }
+        names = {code: name for name, code in code_map.items()}
+        groups = {}
+        for code, total_trades, winning_trades, total_pnl in zip(
+                sorted_codes[starts].tolist(), counts.tolist(), wins.tolist(), sums.tolist()):
+            name = names[code]
+            groups[name] = {
+                field: name,
+                'total_trades': total_trades,
+                'winning_trades': winning_trades,
+                'win_rate': round((winning_trades / total_trades) * 100, 2),
+                'profit_loss': round(total_pnl, 2),
+                'avg_trade_pnl': round(total_pnl / total_trades, 2)
+            }
+        return groups
     
     def get_daily_performance(self, date: Optional[datetime] = None) -> Dict:
         """Get daily performance for a specific date"""
@@ -295,12 +860,11 @@ class PortfolioTracker:
             date = datetime.now()
         
         date_str = date.strftime('%Y-%m-%d')
-        daily_trades = [
-            trade for trade in self.trades
-            if trade.entry_time.strftime('%Y-%m-%d') == date_str
-        ]
+        day_start = datetime(date.year, date.month, date.day)
+        cols = self._cols
+        rows = cols.entered_between(to_ns(day_start), to_ns(day_start + timedelta(days=1)))
         
-        if not daily_trades:
+        if not rows.size:
             return {
                 'date': date_str,
                 'total_trades': 0,
@@ -309,46 +873,51 @@ class PortfolioTracker:
                 'win_rate': 0
             }
         
-        closed_daily = [t for t in daily_trades if t.status != TradeStatus.OPEN]
-        winning_daily = [t for t in closed_daily if t.profit_loss and t.profit_loss > 0]
+        closed_pnl = cols.pnl[rows][cols.status[rows] != STATUS_OPEN]
+        closed_daily = int(closed_pnl.size)
+        winning_daily = int(np.count_nonzero(closed_pnl > 0))
         
-        win_rate = (len(winning_daily) / len(closed_daily)) * 100 if closed_daily else 0
-        total_pnl = sum(t.profit_loss for t in closed_daily if t.profit_loss) or 0
+        win_rate = (winning_daily / closed_daily) * 100 if closed_daily else 0
+        total_pnl = float(closed_pnl.sum())
         
         return {
             'date': date_str,
-            'total_trades': len(daily_trades),
-            'closed_trades': len(closed_daily),
-            'open_trades': len(daily_trades) - len(closed_daily),
-            'winning_trades': len(winning_daily),
-            'losing_trades': len(closed_daily) - len(winning_daily),
+            'total_trades': int(rows.size),
+            'closed_trades': closed_daily,
+            'open_trades': int(rows.size) - closed_daily,
+            'winning_trades': winning_daily,
+            'losing_trades': closed_daily - winning_daily,
             'win_rate': round(win_rate, 2),
             'profit_loss': round(total_pnl, 2)
         }
     
     def update_daily_stats(self):
         """Update daily statistics"""
-        today = datetime.now().strftime('%Y-%m-%d')
-        today_performance = self.get_daily_performance()
+        now = datetime.now()
+        today = now.strftime('%Y-%m-%d')
+        today_performance = self.get_daily_performance(now)
         
         self.daily_stats[today] = today_performance
+        self.daily_stats.move_to_end(today)
         
-        # Keep only last 30 days of daily stats
-        cutoff_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
-        self.daily_stats = {
-            date: stats for date, stats in self.daily_stats.items()
-            if date >= cutoff_date
-        }
+        # Keep only last 30 days of daily stats; keys are in date order, so
+        # expired days are always at the front
+        cutoff_date = (now - timedelta(days=30)).strftime('%Y-%m-%d')
+        while self.daily_stats and next(iter(self.daily_stats)) < cutoff_date:
+            self.daily_stats.popitem(last=False)
     
     def get_summary(self) -> Dict:
         """Get portfolio summary"""
+        return self._memo(('summary',), self._compute_summary)
+    
+    def _compute_summary(self) -> Dict:
         total_stats = self.get_trade_statistics(30)
-        open_trades = self.get_open_trades()
+        open_trades = int(np.count_nonzero(self._cols.status == STATUS_OPEN))
         today_stats = self.get_daily_performance()
         
         return {
             'total_trades': total_stats['total_trades'],
-            'open_trades': len(open_trades),
+            'open_trades': open_trades,
             'win_rate': total_stats['win_rate'],
             'total_profit_loss': total_stats['total_profit_loss'],
             'today_pnl': today_stats['profit_loss'],
@@ -395,29 +964,40 @@ class PortfolioTracker:
                 logger.warning("No trades to export")
                 return
             
-            # Convert trades to DataFrame
-            trade_data = []
-            for trade in self.trades:
-                trade_data.append({
-                    'ID': trade.id,
-                    'Symbol': trade.symbol,
-                    'Type': trade.trade_type.value,
-                    'Entry Price': trade.entry_price,
-                    'Exit Price': trade.exit_price or '',
-                    'Quantity': trade.quantity,
-                    'Entry Time': trade.entry_time,
-                    'Exit Time': trade.exit_time or '',
-                    'Status': trade.status.value,
-                    'Stop Loss': trade.stop_loss or '',
-                    'Take Profit': trade.take_profit or '',
-                    'Profit/Loss': trade.profit_loss or '',
-                    'Confidence': trade.confidence,
-                    'Timeframe': trade.timeframe,
-                    'Signal Reasons': '; '.join(trade.signal_reasons)
-                })
+            if pacsv is not None:
+                # Arrow's C++ writer; missing values become empty cells
+                table = trades_to_table(self.trades, self.daily_stats)
+                reasons = pc.binary_join(table.column('signal_reasons'), '; ')
+                table = table.set_column(table.schema.get_field_index('signal_reasons'), 'signal_reasons', reasons)
+                table = table.select(list(CSV_COLUMNS)).rename_columns(list(CSV_HEADER))
+                pacsv.write_csv(table, filename)
+                logger.info(f"Trades exported to {filename}")
+                return
             
-            df = pd.DataFrame(trade_data)
-            df.to_csv(filename, index=False)
+            # Stream rows straight to disk instead of building a DataFrame first
+            with open(filename, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(CSV_HEADER)
+                writer.writerows(
+                    (
+                        trade.id,
+                        trade.symbol,
+                        trade.trade_type.value,
+                        trade.entry_price,
+                        trade.exit_price or '',
+                        trade.quantity,
+                        trade.entry_time,
+                        trade.exit_time or '',
+                        trade.status.value,
+                        trade.stop_loss or '',
+                        trade.take_profit or '',
+                        trade.profit_loss or '',
+                        trade.confidence,
+                        trade.timeframe,
+                        '; '.join(trade.signal_reasons)
+                    )
+                    for trade in self.trades
+                )
             logger.info(f"Trades exported to {filename}")
             
         except Exception as e:
@@ -425,9 +1005,13 @@ class PortfolioTracker:
     
     def get_risk_metrics(self) -> Dict:
         """Calculate portfolio risk metrics"""
-        closed_trades = self.get_closed_trades(30)
+        return self._memo(('risk',), self._compute_risk_metrics)
+    
+    def _compute_risk_metrics(self) -> Dict:
+        cols = self._cols
+        closed = cols.closed_mask(30)
         
-        if not closed_trades:
+        if not closed.any():
             return {
                 'max_drawdown': 0,
                 'var_95': 0,
@@ -436,9 +1020,10 @@ class PortfolioTracker:
             }
         
         # Calculate returns
-        returns = [t.profit_loss for t in closed_trades if t.profit_loss]
+        closed_pnl = cols.pnl[closed]
+        returns = closed_pnl[closed_pnl != 0]
         
-        if not returns:
+        if not returns.size:
             return {
                 'max_drawdown': 0,
                 'var_95': 0,
@@ -447,29 +1032,23 @@ class PortfolioTracker:
             }
         
         # Value at Risk (95% confidence)
-        var_95 = sorted(returns)[int(len(returns) * 0.05)]
-        
-        # Maximum consecutive losses
-        max_consecutive_losses = 0
-        current_consecutive = 0
-        for trade in reversed(closed_trades):
-            if trade.profit_loss and trade.profit_loss < 0:
-                current_consecutive += 1
-                max_consecutive_losses = max(max_consecutive_losses, current_consecutive)
-            else:
-                current_consecutive = 0
+        k = int(returns.size * 0.05)
+        var_95 = float(np.partition(returns, k)[k])
+        
+        # Maximum consecutive losses (run length does not depend on scan direction)
+        longest_losing_run = int(max_consecutive_losses(closed_pnl))
         
         # Simplified Sharpe ratio calculation
-        avg_return = sum(returns) / len(returns)
-        return_std = pd.Series(returns).std() if len(returns) > 1 else 0
+        avg_return = float(returns.mean())
+        return_std = float(np.std(returns, ddof=1)) if returns.size > 1 else 0
         sharpe_ratio = avg_return / return_std if return_std > 0 else 0
         
         # Maximum drawdown (simplified)
-        max_drawdown = min(returns) if returns else 0
+        max_drawdown = float(returns.min())
         
         return {
             'max_drawdown': round(max_drawdown, 2),
             'var_95': round(var_95, 2),
             'sharpe_ratio': round(sharpe_ratio, 2),
-            'max_consecutive_losses': max_consecutive_losses
+            'max_consecutive_losses': longest_losing_run
         }
\ No newline at end of file
@@ -3,13 +3,152 @@ Risk Management Module for Pocket Option Trading Bot
 Implements comprehensive risk management and position sizing
 """
 
-import pandas as pd
+import copy
 import numpy as np
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import logging
-from datetime import datetime, timedelta
-import json
-import os
+from dataclasses import dataclass, field
+from datetime import date, datetime
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from types import MappingProxyType
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+RISK_LEVELS = ('VERY_LOW', 'LOW', 'MEDIUM', 'HIGH', 'VERY_HIGH')
+RISK_LEVEL_CODES = {level: code for code, level in enumerate(RISK_LEVELS)}
+HIGH_RISK_CODE = RISK_LEVEL_CODES['HIGH']  # this code and above count as high risk
+# Portfolio score contributed by one signal, indexed by risk level code
+LEVEL_TO_SCORE = np.array([-2, -1, 0, 1, 2], dtype=np.int8)
+NO_INDICATORS = MappingProxyType({})  # shared read-only default for signals without indicators
+DAY_CHECK_INTERVAL = 60  # seconds the cached calendar date is reused
+REPORT_CACHE_SIZE = 16  # recent risk reports kept for repeated identical signal lists
+
+# Assessment warnings are collected as bits of an int mask and only turned
+# into strings at the end; bit i stands for WARN_STRINGS[i]
+WARN_STRINGS = (
+    'Invalid price data',
+    'Poor risk-reward ratio',
+    'High stop loss percentage',
+    'Very tight stop loss',
+    'Low signal confidence',
+    'High market volatility',
+    'Daily trading limit reached',
+)
+W_INVALID_PRICE, W_BAD_RR, W_HIGH_SL, W_TIGHT_SL, W_LOW_CONFIDENCE, W_HIGH_VOLATILITY, W_DAILY_LIMIT = (
+    1 << bit for bit in range(len(WARN_STRINGS))
+)
+
+@lru_cache(maxsize=None)
+def warning_messages(mask: int) -> Tuple[str, ...]:
+    """Warning strings for a warning bit mask, in WARN_STRINGS order"""
+    return tuple(message for bit, message in enumerate(WARN_STRINGS) if mask >> bit & 1)
+
+def jit(func):
+    """Compile a kernel with Numba when it is installed, else run it as plain Python"""
+    return njit(cache=True)(func) if njit is not None else func
+
+@jit
+def score_signal(current_price, stop_loss, take_profit, confidence, side, rsi, macd, macd_signal, adx):
+    """Score one signal with the five risk rules
+    
+    side is 1 for BUY, -1 for SELL and 0 for anything else. Returns
+    (risk_score, risk level code, warning mask, risk-reward ratio, stop distance).
+    """
+    warn_mask = 0
+    stop_distance = abs(current_price - stop_loss)
+    risk_percent = (stop_distance / current_price) * 100
+    
+    if side == 1:
+        profit_distance = take_profit - current_price
+    else:
+        profit_distance = current_price - take_profit
+    risk_reward_ratio = profit_distance / stop_distance if stop_distance > 0 else 0.0
+    
+    # 1. Risk-reward ratio assessment
+    if risk_reward_ratio < 1:
+        risk_score = 3
+        warn_mask |= W_BAD_RR
+    elif risk_reward_ratio < 1.5:
+        risk_score = 1
+    else:
+        risk_score = -1  # Good risk-reward
+    
+    # 2. Stop loss distance assessment
+    if risk_percent > 5:
+        risk_score += 2
+        warn_mask |= W_HIGH_SL
+    elif risk_percent < 1:
+        risk_score += 1
+        warn_mask |= W_TIGHT_SL
+    
+    # 3. Confidence level assessment
+    if confidence < 30:
+        risk_score += 2
+        warn_mask |= W_LOW_CONFIDENCE
+    elif confidence > 70:
+        risk_score -= 2  # High confidence
+    
+    # 4. Technical indicator alignment: RSI in its neutral band for either side,
+    # MACD above its signal line for BUY / below it for SELL
+    risk_score += 1 if side != 0 and 30 < rsi < 70 else -1
+    risk_score += 1 if side * (macd - macd_signal) > 0 else -1
+    
+    # 5. Market volatility check
+    if adx > 30:
+        risk_score += 1  # High volatility increases risk
+        warn_mask |= W_HIGH_VOLATILITY
+    
+    level_code = min(4, max(0, (risk_score + 3) // 2))  # see risk_level_codes
+    
+    return risk_score, level_code, warn_mask, risk_reward_ratio, stop_distance
+
+if njit is not None:
+    # Compile (or load from cache) now so the first real call is not slow
+    score_signal(1.0, 0.99, 1.02, 50.0, 1, 50.0, 0.0, 0.0, 0.0)
+
+def risk_level_codes(risk_score):
+    """Risk level code for integer scores: <=-2, <=0, <=2, <=4 and above map to 0..4
+    
+    Each level spans two scores, so (score + 3) // 2 clamped to 0..4 replaces
+    the comparison ladder; works on scalars and arrays.
+    """
+    return np.clip((risk_score + 3) // 2, 0, 4)
+
+def win_probability(confidence):
+    """Signal confidence (0-100) as a win probability for Kelly sizing"""
+    return np.clip(np.asarray(confidence, dtype=float) / 100.0, 0.01, 0.99)
+
+_timestamp_cache = [0, '']  # [epoch second, its formatted local time]
+
+def _now_str() -> str:
+    """Current local time as 'YYYY-MM-DD HH:MM:SS', formatted at most once per second"""
+    second = int(time.time())
+    if second != _timestamp_cache[0]:
+        _timestamp_cache[0] = second
+        _timestamp_cache[1] = datetime.fromtimestamp(second).strftime('%Y-%m-%d %H:%M:%S')
+    return _timestamp_cache[1]
+
+@dataclass(slots=True)
+class DailyStats:
+    """Trading counters for the current day, reset in place at day rollover"""
+    trades_taken: int = 0
+    signals_sent: int = 0
+    max_trades_reached: bool = False
+    win_rate: float = 0.0
+    profit_loss: float = 0.0
+    last_reset: date = field(default_factory=date.today)
+    
+    def reset(self, day: date):
+        """Zero every counter and stamp the reset day"""
+        self.trades_taken = self.signals_sent = 0
+        self.max_trades_reached = False
+        self.win_rate = self.profit_loss = 0.0
+        self.last_reset = day
 
 class RiskManager:
     """Advanced risk management system for trading"""
@@ -17,15 +156,33 @@ class RiskManager:
     def __init__(self, config: Dict):
         self.config = config
         self.logger = logging.getLogger(__name__)
-        self.daily_stats = {
-            'trades_taken': 0,
-            'signals_sent': 0,
-            'max_trades_reached': False,
-            'win_rate': 0.0,
-            'profit_loss': 0.0,
-            'last_reset': datetime.now().date()
-        }
+        self.reload_config()
+        self._day_checked_at = 0.0
+        self._cached_day = None
+        self.daily_stats = DailyStats(last_reset=self._current_day())
+        
+    def reload_config(self):
+        """Read the limits used on every assessment from self.config
         
+        Call again after changing self.config at runtime.
+        """
+        config = self.config
+        self._risk_pct = float(config.get('RISK_PERCENTAGE', 2.0))
+        self._max_position = float(config.get('MAX_POSITION_SIZE', 100))
+        self._max_signals = int(config.get('MAX_DAILY_SIGNALS', 50))
+        self._max_dd_pct = float(config.get('MAX_DRAWDOWN_PERCENTAGE', 10))
+        self._max_heat = float(config.get('MAX_PORTFOLIO_HEAT', 20))  # % of account
+        self._kelly_sizing = str(config.get('POSITION_SIZING_METHOD', 'fixed')).lower() == 'kelly'
+        self._report_cache = OrderedDict()  # reports depend on the limits above
+    
+    def _current_day(self):
+        """Today's date, re-read from the clock at most every DAY_CHECK_INTERVAL seconds"""
+        now = time.monotonic()
+        if self._cached_day is None or now - self._day_checked_at >= DAY_CHECK_INTERVAL:
+            self._cached_day = datetime.now().date()
+            self._day_checked_at = now
+        return self._cached_day
+    
     def calculate_position_size(self, account_balance: float, risk_percentage: float, 
                               stop_loss_distance: float) -> float:
         """Calculate position size based on risk management rules"""
@@ -33,11 +190,28 @@ class RiskManager:
         position_size = risk_amount / stop_loss_distance if stop_loss_distance > 0 else 0
         
         # Apply maximum position size limit
-        max_position = self.config.get('MAX_POSITION_SIZE', 100)
-        return min(position_size, max_position)
+        return min(position_size, self._max_position)
     
-    def assess_trade_risk(self, signal: Dict, account_balance: float = 1000) -> Dict:
-        """Comprehensive risk assessment for a trading signal"""
+    def calculate_position_size_kelly(self, account_balance: float, win_prob, risk_reward_ratio,
+                                      fraction: float = 0.5):
+        """Fractional Kelly position size, f = p - (1 - p) / R, for scalars or arrays
+        
+        Half-Kelly by default; signals without a positive edge or reward get 0.
+        """
+        win_prob = np.asarray(win_prob, dtype=float)
+        risk_reward_ratio = np.asarray(risk_reward_ratio, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            kelly = np.where(risk_reward_ratio > 0, win_prob - (1 - win_prob) / risk_reward_ratio, 0.0)
+        return np.clip(account_balance * fraction * kelly, 0, self._max_position)
+    
+    def assess_trade_risk(self, signal: Dict, account_balance: float = 1000,
+                          include_warnings: bool = True) -> Dict:
+        """Comprehensive risk assessment for a trading signal
+        
+        The warnings found are always returned as the 'warning_mask' bit mask;
+        the 'warnings' list of strings is filled in only with include_warnings.
+        """
+        warn_mask = 0
         risk_assessment = {
             'risk_level': 'LOW',
             'score': 0,
@@ -56,103 +230,33 @@ class RiskManager:
             
             if current_price == 0 or stop_loss == 0:
                 risk_assessment['recommendation'] = 'REJECTED'
-                risk_assessment['warnings'].append('Invalid price data')
-                return risk_assessment
+                return self._attach_warnings(risk_assessment, W_INVALID_PRICE, include_warnings)
             
-            # Calculate stop loss distance
-            stop_distance = abs(current_price - stop_loss)
-            risk_percent = (stop_distance / current_price) * 100
-            
-            # Calculate risk-reward ratio
-            if signal.get('signal') == 'BUY':
-                profit_distance = take_profit - current_price
-            else:
-                profit_distance = current_price - take_profit
-            
-            if stop_distance > 0:
-                risk_reward_ratio = profit_distance / stop_distance
-            else:
-                risk_reward_ratio = 0
+            side = signal.get('signal')
+            indicators = signal.get('technical_indicators', NO_INDICATORS)
+            risk_score, level_code, warn_mask, risk_reward_ratio, stop_distance = score_signal(
+                float(current_price), float(stop_loss), float(take_profit), float(confidence),
+                1 if side == 'BUY' else -1 if side == 'SELL' else 0,
+                float(indicators.get('RSI', 50)), float(indicators.get('MACD', 0)),
+                float(indicators.get('MACD_Signal', 0)), float(indicators.get('ADX', 0))
+            )
             
             risk_assessment['risk_reward_ratio'] = risk_reward_ratio
             risk_assessment['max_loss'] = stop_distance
-            
-            # Risk scoring system
-            risk_score = 0
-            
-            # 1. Risk-reward ratio assessment
-            if risk_reward_ratio < 1:
-                risk_score += 3
-                risk_assessment['warnings'].append('Poor risk-reward ratio')
-            elif risk_reward_ratio < 1.5:
-                risk_score += 1
-            else:
-                risk_score -= 1  # Good risk-reward
-            
-            # 2. Stop loss distance assessment
-            if risk_percent > 5:
-                risk_score += 2
-                risk_assessment['warnings'].append('High stop loss percentage')
-            elif risk_percent < 1:
-                risk_score += 1
-                risk_assessment['warnings'].append('Very tight stop loss')
-            
-            # 3. Confidence level assessment
-            if confidence < 30:
-                risk_score += 2
-                risk_assessment['warnings'].append('Low signal confidence')
-            elif confidence > 70:
-                risk_score -= 2  # High confidence
-            
-            # 4. Technical indicator alignment
-            indicators = signal.get('technical_indicators', {})
-            alignment_score = 0
-            
-            # RSI check
-            rsi = indicators.get('RSI', 50)
-            if (signal.get('signal') == 'BUY' and 30 < rsi < 70) or \
-               (signal.get('signal') == 'SELL' and 30 < rsi < 70):
-                alignment_score += 1
-            else:
-                alignment_score -= 1
-            
-            # MACD check
-            macd = indicators.get('MACD', 0)
-            macd_signal = indicators.get('MACD_Signal', 0)
-            if (signal.get('signal') == 'BUY' and macd > macd_signal) or \
-               (signal.get('signal') == 'SELL' and macd < macd_signal):
-                alignment_score += 1
-            else:
-                alignment_score -= 1
-            
-            risk_score += alignment_score
-            
-            # 5. Market volatility check
-            adx = indicators.get('ADX', 0)
-            if adx > 30:
-                risk_score += 1  # High volatility increases risk
-                risk_assessment['warnings'].append('High market volatility')
-            
             risk_assessment['score'] = risk_score
-            
-            # Determine risk level
-            if risk_score <= -2:
-                risk_assessment['risk_level'] = 'VERY_LOW'
-            elif risk_score <= 0:
-                risk_assessment['risk_level'] = 'LOW'
-            elif risk_score <= 2:
-                risk_assessment['risk_level'] = 'MEDIUM'
-            elif risk_score <= 4:
-                risk_assessment['risk_level'] = 'HIGH'
-            else:
-                risk_assessment['risk_level'] = 'VERY_HIGH'
+            risk_assessment['risk_level'] = RISK_LEVELS[level_code]
             
             # Calculate recommended position size
-            position_size = self.calculate_position_size(
-                account_balance, 
-                self.config.get('RISK_PERCENTAGE', 2.0), 
-                stop_distance
-            )
+            if self._kelly_sizing:
+                position_size = float(self.calculate_position_size_kelly(
+                    account_balance, win_probability(confidence), risk_reward_ratio
+                ))
+            else:
+                position_size = self.calculate_position_size(
+                    account_balance, 
+                    self._risk_pct, 
+                    stop_distance
+                )
             risk_assessment['position_size'] = position_size
             
             # Final recommendation
@@ -164,67 +268,189 @@ class RiskManager:
             # Daily limits check
             if self.check_daily_limits():
                 risk_assessment['recommendation'] = 'REJECTED'
-                risk_assessment['warnings'].append('Daily trading limit reached')
+                warn_mask |= W_DAILY_LIMIT
             
         except Exception as e:
             self.logger.error(f"Error in risk assessment: {e}")
             risk_assessment['recommendation'] = 'ERROR'
             risk_assessment['warnings'].append(f'Risk assessment error: {str(e)}')
         
+        return self._attach_warnings(risk_assessment, warn_mask, include_warnings)
+    
+    @staticmethod
+    def _attach_warnings(risk_assessment: Dict, warn_mask: int, include_warnings: bool) -> Dict:
+        """Store the warning mask and, if wanted, its messages ahead of any error text"""
+        risk_assessment['warning_mask'] = warn_mask
+        if include_warnings:
+            risk_assessment['warnings'][:0] = warning_messages(warn_mask)
         return risk_assessment
     
+    def assess_trade_risk_batch(self, signals: List[Dict], account_balance: float = 1000,
+                                include_warnings: bool = True) -> List[Dict]:
+        """Risk assessment for many signals at once
+        
+        Scores every signal with vectorized column arithmetic instead of one
+        assess_trade_risk call per signal; the result for each signal is the same.
+        """
+        return self._assess_batch(signals, account_balance, include_warnings)[0]
+    
+    def _assess_batch(self, signals: List[Dict], account_balance: float,
+                      include_warnings: bool = True) -> Tuple[List[Dict], np.ndarray]:
+        """Assessments plus the risk level code (index into RISK_LEVELS) of each"""
+        count = len(signals)
+        indicators = [signal.get('technical_indicators', NO_INDICATORS) for signal in signals]
+        
+        def column(rows, key, default):
+            return np.fromiter((row.get(key, default) for row in rows), dtype=float, count=count)
+        
+        try:
+            current_price = column(signals, 'current_price', 0)
+            stop_loss = column(signals, 'stop_loss', 0)
+            take_profit = column(signals, 'take_profit', 0)
+            confidence = column(signals, 'confidence', 0)
+            rsi = column(indicators, 'RSI', 50)
+            macd = column(indicators, 'MACD', 0)
+            macd_signal = column(indicators, 'MACD_Signal', 0)
+            adx = column(indicators, 'ADX', 0)
+        except (TypeError, ValueError, AttributeError):
+            # Malformed input: let the per-signal path report each failure
+            assessments = [
+                self.assess_trade_risk(signal, account_balance, include_warnings) for signal in signals
+            ]
+            level_codes = np.fromiter(
+                (RISK_LEVEL_CODES[assessment['risk_level']] for assessment in assessments),
+                dtype=np.int8, count=count
+            )
+            return assessments, level_codes
+        
+        side_names = np.array([signal.get('signal') for signal in signals], dtype=object)
+        is_buy = side_names == 'BUY'
+        is_sell = side_names == 'SELL'
+        side = is_buy.astype(np.int8) - is_sell  # 1 BUY, -1 SELL, 0 other, as in score_signal
+        valid = (current_price != 0) & (stop_loss != 0)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            stop_distance = np.abs(current_price - stop_loss)
+            risk_percent = (stop_distance / current_price) * 100
+            profit_distance = np.where(is_buy, take_profit - current_price, current_price - take_profit)
+            risk_reward_ratio = np.where(stop_distance > 0, profit_distance / stop_distance, 0.0)
+        
+        if self._kelly_sizing:
+            position_size = self.calculate_position_size_kelly(
+                account_balance, win_probability(confidence), risk_reward_ratio
+            )
+        else:
+            risk_amount = account_balance * (self._risk_pct / 100)
+            with np.errstate(divide='ignore'):
+                position_size = np.where(stop_distance > 0, risk_amount / stop_distance, 0.0)
+            position_size = np.minimum(position_size, self._max_position)
+        
+        # Same five rules as assess_trade_risk, one vector expression each
+        poor_rr = risk_reward_ratio < 1
+        high_stop = risk_percent > 5
+        tight_stop = risk_percent < 1
+        low_confidence = confidence < 30
+        high_volatility = adx > 30
+        
+        risk_score = np.where(poor_rr, 3, np.where(risk_reward_ratio < 1.5, 1, -1)).astype(np.int8)
+        risk_score += np.where(high_stop, 2, np.where(tight_stop, 1, 0))
+        risk_score += np.where(low_confidence, 2, np.where(confidence > 70, -2, 0))
+        risk_score += np.where((side != 0) & (rsi > 30) & (rsi < 70), 1, -1)
+        risk_score += np.where(side * (macd - macd_signal) > 0, 1, -1)
+        risk_score += high_volatility
+        
+        level_codes = risk_level_codes(risk_score)
+        level_codes[~valid] = RISK_LEVEL_CODES['LOW']
+        recommendation = np.select(
+            [(risk_score > 4) | (confidence < 20), risk_score > 2],
+            ['REJECTED', 'CAUTION'], 'APPROVED'
+        )
+        limit_reached = self.check_daily_limits()
+        
+        warn_masks = np.zeros(count, dtype=np.uint16)
+        warn_masks[poor_rr] |= W_BAD_RR
+        warn_masks[high_stop] |= W_HIGH_SL
+        warn_masks[tight_stop & ~high_stop] |= W_TIGHT_SL
+        warn_masks[low_confidence] |= W_LOW_CONFIDENCE
+        warn_masks[high_volatility] |= W_HIGH_VOLATILITY
+        if limit_reached:
+            warn_masks |= W_DAILY_LIMIT
+        warn_masks[~valid] = W_INVALID_PRICE
+        
+        assessments = []
+        for i, warn_mask in enumerate(warn_masks.tolist()):
+            warnings = list(warning_messages(warn_mask)) if include_warnings else []
+            if not valid[i]:
+                assessments.append({
+                    'risk_level': 'LOW',
+                    'score': 0,
+                    'max_loss': 0,
+                    'risk_reward_ratio': 0,
+                    'warnings': warnings,
+                    'recommendation': 'REJECTED',
+                    'position_size': 0,
+                    'warning_mask': warn_mask
+                })
+                continue
+            
+            assessments.append({
+                'risk_level': RISK_LEVELS[level_codes[i]],
+                'score': int(risk_score[i]),
+                'max_loss': float(stop_distance[i]),
+                'risk_reward_ratio': float(risk_reward_ratio[i]),
+                'warnings': warnings,
+                'recommendation': 'REJECTED' if limit_reached else str(recommendation[i]),
+                'position_size': float(position_size[i]),
+                'warning_mask': warn_mask
+            })
+        
+        return assessments, level_codes
+    
     def check_daily_limits(self) -> bool:
         """Check if daily trading limits are reached"""
-        current_date = datetime.now().date()
+        current_date = self._current_day()
         
         # Reset daily stats if it's a new day
-        if self.daily_stats['last_reset'] != current_date:
+        if self.daily_stats.last_reset != current_date:
             self.reset_daily_stats()
         
-        max_signals = self.config.get('MAX_DAILY_SIGNALS', 50)
-        return self.daily_stats['signals_sent'] >= max_signals
+        return self.daily_stats.signals_sent >= self._max_signals
     
     def reset_daily_stats(self):
         """Reset daily trading statistics"""
-        self.daily_stats = {
-            'trades_taken': 0,
-            'signals_sent': 0,
-            'max_trades_reached': False,
-            'win_rate': 0.0,
-            'profit_loss': 0.0,
-            'last_reset': datetime.now().date()
-        }
+        self.daily_stats.reset(self._current_day())
+        self._report_cache.clear()
         self.logger.info("Daily stats reset")
     
     def update_daily_stats(self, signal_sent: bool = False, trade_result: Optional[Dict] = None):
         """Update daily trading statistics"""
-        current_date = datetime.now().date()
+        current_date = self._current_day()
         
-        if self.daily_stats['last_reset'] != current_date:
+        if self.daily_stats.last_reset != current_date:
             self.reset_daily_stats()
         
         if signal_sent:
-            self.daily_stats['signals_sent'] += 1
+            self.daily_stats.signals_sent += 1
         
         if trade_result:
-            self.daily_stats['trades_taken'] += 1
+            self.daily_stats.trades_taken += 1
             if 'profit_loss' in trade_result:
-                self.daily_stats['profit_loss'] += trade_result['profit_loss']
+                self.daily_stats.profit_loss += trade_result['profit_loss']
     
     def get_daily_summary(self) -> Dict:
         """Get daily trading summary"""
         return {
-            'date': datetime.now().date().strftime('%Y-%m-%d'),
-            'signals_sent': self.daily_stats['signals_sent'],
-            'trades_taken': self.daily_stats['trades_taken'],
-            'profit_loss': round(self.daily_stats['profit_loss'], 2),
-            'remaining_signals': max(0, self.config.get('MAX_DAILY_SIGNALS', 50) - self.daily_stats['signals_sent']),
-            'max_trades_reached': self.daily_stats['signals_sent'] >= self.config.get('MAX_DAILY_SIGNALS', 50)
+            'date': self._current_day().strftime('%Y-%m-%d'),
+            'signals_sent': self.daily_stats.signals_sent,
+            'trades_taken': self.daily_stats.trades_taken,
+            'profit_loss': self.daily_stats.profit_loss,
+            'remaining_signals': max(0, self._max_signals - self.daily_stats.signals_sent),
+            'max_trades_reached': self.daily_stats.signals_sent >= self._max_signals
         }
     
     def calculate_drawdown_risk(self, account_balance: float, current_drawdown: float) -> Dict:
         """Calculate drawdown risk metrics"""
-        max_drawdown_limit = self.config.get('MAX_DRAWDOWN_PERCENTAGE', 10)
+        max_drawdown_limit = self._max_dd_pct
         current_drawdown_pct = (current_drawdown / account_balance) * 100
         
         drawdown_risk = {
@@ -246,8 +472,14 @@ class RiskManager:
     
     def portfolio_heat_check(self, current_positions: List[Dict], account_balance: float) -> Dict:
         """Check overall portfolio heat (total exposure)"""
-        total_exposure = sum(pos.get('size', 0) for pos in current_positions)
-        max_portfolio_heat = self.config.get('MAX_PORTFOLIO_HEAT', 20)  # 20% of account
+        sizes = np.fromiter((pos.get('size', 0) for pos in current_positions),
+                            dtype=np.float64, count=len(current_positions))
+        return self.portfolio_heat_check_vec(sizes, account_balance)
+    
+    def portfolio_heat_check_vec(self, sizes: np.ndarray, account_balance: float) -> Dict:
+        """Portfolio heat check for position sizes already held in an array"""
+        total_exposure = float(sizes.sum())
+        max_portfolio_heat = self._max_heat
         
         portfolio_heat_pct = (total_exposure / account_balance) * 100 if account_balance > 0 else 0
         
@@ -269,12 +501,48 @@ class RiskManager:
         return heat_check
     
     def generate_risk_report(self, signals: List[Dict], account_balance: float = 1000) -> Dict:
-        """Generate comprehensive risk report for multiple signals"""
+        """Generate comprehensive risk report for multiple signals
+        
+        Reports are cached per set of signal inputs, so polling with an unchanged
+        signal list returns a copy of the previous report with a fresh timestamp.
+        """
         if not signals:
             return {'error': 'No signals provided'}
         
+        try:
+            key = (account_balance, self.check_daily_limits(), tuple(self._signal_key(signal) for signal in signals))
+            hash(key)
+        except TypeError:
+            key = None  # unhashable signal values: always build the report
+        
+        report = self._report_cache.get(key) if key is not None else None
+        if report is None:
+            report = self._build_risk_report(signals, account_balance)
+            if key is not None:
+                self._report_cache[key] = report
+                if len(self._report_cache) > REPORT_CACHE_SIZE:
+                    self._report_cache.popitem(last=False)
+        else:
+            self._report_cache.move_to_end(key)
+        
+        report = copy.deepcopy(report)
+        report['timestamp'] = _now_str()
+        return report
+    
+    @staticmethod
+    def _signal_key(signal: Dict) -> Tuple:
+        """Every signal field a risk report depends on"""
+        indicators = signal.get('technical_indicators', NO_INDICATORS)
+        return (
+            signal.get('symbol'), signal.get('signal'), signal.get('current_price', 0),
+            signal.get('stop_loss', 0), signal.get('take_profit', 0), signal.get('confidence', 0),
+            indicators.get('RSI', 50), indicators.get('MACD', 0),
+            indicators.get('MACD_Signal', 0), indicators.get('ADX', 0)
+        )
+    
+    def _build_risk_report(self, signals: List[Dict], account_balance: float) -> Dict:
         report = {
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'timestamp': _now_str(),
             'signals_analyzed': len(signals),
             'account_balance': account_balance,
             'individual_assessments': [],
@@ -288,14 +556,15 @@ class RiskManager:
             'recommendations': []
         }
         
-        total_risk_score = 0
         total_confidence = 0
         approved_count = 0
         
-        for signal in signals:
-            assessment = self.assess_trade_risk(signal, account_balance)
+        assessments, level_codes = self._assess_batch(signals, account_balance)
+        overview = report['portfolio_overview']
+        for signal, assessment in zip(signals, assessments):
+            symbol = signal.get('symbol')
             report['individual_assessments'].append({
-                'symbol': signal.get('symbol'),
+                'symbol': symbol,
                 'signal': signal.get('signal'),
                 'risk_level': assessment['risk_level'],
                 'recommendation': assessment['recommendation'],
@@ -305,22 +574,15 @@ class RiskManager:
             
             if assessment['recommendation'] == 'APPROVED':
                 approved_count += 1
-                report['portfolio_overview']['approved_signals'].append(signal.get('symbol'))
+                overview['approved_signals'].append(symbol)
             else:
-                report['portfolio_overview']['rejected_signals'].append(signal.get('symbol'))
+                overview['rejected_signals'].append(symbol)
             
-            # Convert risk level to score for aggregation
-            risk_score_map = {
-                'VERY_LOW': -2, 'LOW': -1, 'MEDIUM': 0, 
-                'HIGH': 1, 'VERY_HIGH': 2
-            }
-            total_risk_score += risk_score_map.get(assessment['risk_level'], 0)
             total_confidence += signal.get('confidence', 0)
-            
-            if assessment['risk_level'] in ['HIGH', 'VERY_HIGH']:
-                report['portfolio_overview']['high_risk_count'] += 1
         
-        # Calculate portfolio metrics
+        # Calculate portfolio metrics; risk levels map to scores through a lookup table
+        total_risk_score = int(LEVEL_TO_SCORE[level_codes].sum())
+        report['portfolio_overview']['high_risk_count'] = int(np.count_nonzero(level_codes >= HIGH_RISK_CODE))
         report['portfolio_overview']['total_risk_score'] = total_risk_score
         report['portfolio_overview']['average_confidence'] = total_confidence / len(signals) if signals else 0
         
@@ -4,10 +4,16 @@ Pocket Option Trading Bot - Quick Start Script
 Run this script to start the trading bot
 """
 
+import atexit
+import hashlib
 import os
+import queue
+import re
 import sys
 import subprocess
 import logging
+import logging.handlers
+from importlib import metadata
 from pathlib import Path
 
 def check_dependencies():
@@ -22,10 +28,10 @@ def check_dependencies():
         '.env'
     ]
     
-    missing_files = []
-    for file in required_files:
-        if not os.path.exists(file):
-            missing_files.append(file)
+    # One directory listing instead of a stat() per required file
+    with os.scandir('.') as entries:
+        present = {entry.name for entry in entries if entry.is_file()}
+    missing_files = [file for file in required_files if file not in present]
     
     if missing_files:
         print(f"❌ Missing required files: {', '.join(missing_files)}")
@@ -40,12 +46,20 @@ def check_env_config():
         print("❌ .env file not found. Please run 'python setup.py' first.")
         return False
     
-    # Read .env file and check for bot token
+    # Scan .env line by line for the bot token placeholder
     try:
+        has_placeholder = False
+        non_blank = False
         with open('.env', 'r') as f:
-            content = f.read()
+            for line in f:
+                if not line.strip():
+                    continue
+                non_blank = True
+                if 'TELEGRAM_BOT_TOKEN=your_telegram_bot_token_here' in line:
+                    has_placeholder = True
+                    break
         
-        if 'TELEGRAM_BOT_TOKEN=your_telegram_bot_token_here' in content or not content.strip():
+        if has_placeholder or not non_blank:
             print("⚠️  WARNING: Bot token not configured in .env file")
             print("   The bot will not work without a valid bot token.")
             print("   Please edit the .env file and add your Telegram bot token.")
@@ -56,26 +70,75 @@ def check_env_config():
         print(f"❌ Error reading .env file: {e}")
         return False
 
+# SHA-256 of the interpreter plus requirements.txt last installed into it
+REQUIREMENTS_STAMP = '.venv_stamp'
+
+def requirements_installed(requirements):
+    """True if every distribution named in requirements.txt is installed"""
+    for line in requirements.decode().splitlines():
+        match = re.match(r'[A-Za-z0-9._-]+', line.strip())
+        if not match:
+            continue  # blank line or comment
+        try:
+            metadata.distribution(match.group())
+        except metadata.PackageNotFoundError:
+            return False
+    return True
+
 def install_missing_packages():
-    """Install any missing packages"""
+    """Install any missing packages
+    
+    pip only runs when requirements.txt or the interpreter differs from the
+    last successful install, or a listed package has since been removed.
+    """
+    with open('requirements.txt', 'rb') as f:
+        requirements = f.read()
+    requirements_hash = hashlib.sha256(
+        sys.executable.encode() + b'\0' + sys.prefix.encode() + b'\0' + requirements
+    ).hexdigest()
+    
+    try:
+        with open(REQUIREMENTS_STAMP, 'r') as f:
+            if f.read().strip() == requirements_hash and requirements_installed(requirements):
+                print("📦 Packages up to date")
+                return True
+    except OSError:
+        pass
+    
     try:
         print("📦 Checking and installing packages...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
-        return True
+        subprocess.check_call([
+            sys.executable, "-m", "pip", "install",
+            "--disable-pip-version-check", "--no-input", "-q",
+            "-r", "requirements.txt"
+        ])
     except subprocess.CalledProcessError:
         print("❌ Failed to install packages. Please run: pip install -r requirements.txt")
         return False
+    
+    with open(REQUIREMENTS_STAMP, 'w') as f:
+        f.write(requirements_hash)
+    return True
 
 def setup_logging():
-    """Setup logging configuration"""
-    logging.basicConfig(
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        level=logging.INFO,
-        handlers=[
-            logging.FileHandler('bot.log'),
-            logging.StreamHandler()
-        ]
-    )
+    """Setup logging configuration
+    
+    Records are queued by the calling thread and written to bot.log and the
+    console by a background listener, so logging never blocks on I/O.
+    """
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handlers = [logging.FileHandler('bot.log'), logging.StreamHandler()]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
 
 def show_startup_info():
     """Show information about the bot startup"""
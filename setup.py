@@ -8,6 +8,7 @@ import os
 import sys
 import subprocess
 import json
+import re
 from pathlib import Path
 
 def print_header():
@@ -20,8 +21,9 @@ def print_header():
 def check_python_version():
     """Check if Python version is compatible"""
     print("🐍 Checking Python version...")
-    if sys.version_info < (3, 8):
-        print("❌ Error: Python 3.8 or higher is required")
+    # Slotted dataclasses (portfolio_tracker, risk_management, market_news) need 3.10
+    if sys.version_info < (3, 10):
+        print("❌ Error: Python 3.10 or higher is required")
         print(f"   Current version: {sys.version}")
         return False
     
@@ -111,14 +113,20 @@ def update_env_file(user_id=None, bot_token=None):
         with open('.env', 'r') as f:
             content = f.read()
         
-        # Update user ID if provided
+        # Map each placeholder line to its new value, then substitute all in one pass
+        replacements = {}
         if user_id:
-            content = content.replace('TELEGRAM_CHAT_ID=your_chat_id_here', f'TELEGRAM_CHAT_ID={user_id}')
-            print("✅ Updated Telegram Chat ID in .env")
+            replacements['TELEGRAM_CHAT_ID=your_chat_id_here'] = f'TELEGRAM_CHAT_ID={user_id}'
+        if bot_token:
+            replacements['TELEGRAM_BOT_TOKEN=your_telegram_bot_token_here'] = f'TELEGRAM_BOT_TOKEN={bot_token}'
+        
+        if replacements:
+            pattern = re.compile('|'.join(map(re.escape, replacements)))
+            content = pattern.sub(lambda match: replacements[match.group(0)], content)
         
-        # Update bot token if provided
+        if user_id:
+            print("✅ Updated Telegram Chat ID in .env")
         if bot_token:
-            content = content.replace('TELEGRAM_BOT_TOKEN=your_telegram_bot_token_here', f'TELEGRAM_BOT_TOKEN={bot_token}')
             print("✅ Updated Telegram Bot Token in .env")
         
         # Write updated content
@@ -19,26 +19,43 @@ def test_imports():
 
 def test_env_file():
     """Test if .env file exists and has token"""
+    env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
     try:
-        with open('/workspace/.env', 'r') as f:
-            content = f.read()
-            if 'TELEGRAM_BOT_TOKEN' in content and '7369201109:' in content:
-                print("✅ .env file configured correctly")
-                return True
-            else:
-                print("❌ .env file missing token")
-                return False
+        # Scan line by line, stopping once both markers have been seen
+        need = {'TELEGRAM_BOT_TOKEN', '7369201109:'}
+        with open(env_path, 'r') as f:
+            for line in f:
+                need = {marker for marker in need if marker not in line}
+                if not need:
+                    break
+        
+        if not need:
+            print("✅ .env file configured correctly")
+            return True
+        else:
+            print("❌ .env file missing token")
+            return False
     except FileNotFoundError:
         print("❌ .env file not found")
         return False
 
-def test_bot_initialization():
-    """Test if bot can be initialized"""
+def create_bot():
+    """Build the bot shared by the bot tests, or None if construction fails"""
     try:
         from ENHANCED_POCKET_OPTION_BOT import EnhancedPocketOptionBot
         token = "7369201109:AAFCU6umw6bA7RVd-2JbhDnxt5QeiEF7ueQ"
-        bot = EnhancedPocketOptionBot(token)
-        
+        return EnhancedPocketOptionBot(token)
+    except Exception as e:
+        print(f"❌ Bot initialization failed: {e}")
+        return None
+
+def test_bot_initialization(bot):
+    """Test if bot can be initialized"""
+    if bot is None:
+        print("❌ Bot could not be created")
+        return False
+    
+    try:
         # Test if pairs are loaded
         if len(bot.po_pairs) >= 10:
             print("✅ Currency pairs loaded correctly")
@@ -52,19 +69,24 @@ def test_bot_initialization():
         else:
             print("❌ Expiry options not loaded properly")
             return False
+        
+        # Build the application with the same pool settings run() uses
+        # (connection_pool_size / pool_timeout); no network is touched here
+        bot.build_application()
+        print("✅ Telegram application built")
             
         return True
     except Exception as e:
         print(f"❌ Bot initialization failed: {e}")
         return False
 
-def test_data_fetching():
+def test_data_fetching(bot):
     """Test if data fetching works"""
+    if bot is None:
+        print("❌ Data fetching failed: bot could not be created")
+        return False
+    
     try:
-        from ENHANCED_POCKET_OPTION_BOT import EnhancedPocketOptionBot
-        token = "7369201109:AAFCU6umw6bA7RVd-2JbhDnxt5QeiEF7ueQ"
-        bot = EnhancedPocketOptionBot(token)
-        
         # Test data fetching
         data = bot.get_live_market_data("EURUSD")
         if data and "5m" in data:
@@ -82,11 +104,14 @@ def main():
     print("🧪 TESTING ENHANCED POCKET OPTION BOT")
     print("=" * 50)
     
+    # One bot instance is shared by the tests that need it
+    bot = create_bot()
+    
     tests = [
         ("Import Test", test_imports),
         ("Environment File", test_env_file),
-        ("Bot Initialization", test_bot_initialization),
-        ("Data Fetching", test_data_fetching)
+        ("Bot Initialization", lambda: test_bot_initialization(bot)),
+        ("Data Fetching", lambda: test_data_fetching(bot))
     ]
     
     passed = 0
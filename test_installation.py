@@ -3,82 +3,62 @@
 Test script to verify bot installation for Python 3.13
 """
 
+import importlib.util
+from importlib import metadata
+
+# (import name, label, show installed version); presence is checked with
+# find_spec so nothing is imported until a test actually needs it
+REQUIRED_PACKAGES = (
+    ('pandas', 'pandas', True),
+    ('telegram', 'python-telegram-bot', False),
+    ('yfinance', 'yfinance', False),
+    ('numpy', 'numpy', True),
+    ('ta', 'ta (technical analysis)', False),
+    ('requests', 'requests', False),
+    ('dotenv', 'python-dotenv', False),
+)
+OPTIONAL_PACKAGES = (
+    ('aiohttp', 'aiohttp', False),
+)
+BOT_MODULES = (
+    ('technical_analysis', 'technical_analysis module'),
+    ('risk_management', 'risk_management module'),
+)
+
+def package_label(name, label, show_version):
+    """Label for an installed package, with its version when wanted"""
+    if show_version:
+        try:
+            return f"{label} {metadata.version(name)}"
+        except metadata.PackageNotFoundError:
+            pass
+    return label
+
 def test_imports():
-    """Test if all required packages can be imported"""
+    """Test if all required packages are installed"""
     print("🧪 Testing Package Imports...")
     print("-" * 40)
     
     # Test core packages
-    try:
-        import pandas as pd
-        print(f"✅ pandas {pd.__version__}")
-    except ImportError as e:
-        print(f"❌ pandas: {e}")
-        return False
-    
-    try:
-        import telegram
-        print(f"✅ python-telegram-bot")
-    except ImportError as e:
-        print(f"❌ python-telegram-bot: {e}")
-        return False
-    
-    try:
-        import yfinance
-        print(f"✅ yfinance")
-    except ImportError as e:
-        print(f"❌ yfinance: {e}")
-        return False
-    
-    try:
-        import numpy as np
-        print(f"✅ numpy {np.__version__}")
-    except ImportError as e:
-        print(f"❌ numpy: {e}")
-        return False
-    
-    try:
-        import ta
-        print(f"✅ ta (technical analysis)")
-    except ImportError as e:
-        print(f"❌ ta: {e}")
-        return False
-    
-    try:
-        import requests
-        print(f"✅ requests")
-    except ImportError as e:
-        print(f"❌ requests: {e}")
-        return False
-    
-    try:
-        from dotenv import load_dotenv
-        print(f"✅ python-dotenv")
-    except ImportError as e:
-        print(f"❌ python-dotenv: {e}")
-        return False
-    
-    try:
-        import aiohttp
-        print(f"✅ aiohttp")
-    except ImportError as e:
-        print(f"⚠️  aiohttp: {e}")
-        # aiohttp is not critical
+    for name, label, show_version in REQUIRED_PACKAGES:
+        if importlib.util.find_spec(name) is None:
+            print(f"❌ {label}: not installed")
+            return False
+        print(f"✅ {package_label(name, label, show_version)}")
+    
+    for name, label, show_version in OPTIONAL_PACKAGES:
+        if importlib.util.find_spec(name) is None:
+            print(f"⚠️  {label}: not installed")
+            # not critical
+        else:
+            print(f"✅ {package_label(name, label, show_version)}")
     
     # Test bot modules
-    try:
-        from technical_analysis import TechnicalAnalyzer
-        print(f"✅ technical_analysis module")
-    except ImportError as e:
-        print(f"❌ technical_analysis: {e}")
-        return False
-    
-    try:
-        from risk_management import RiskManager
-        print(f"✅ risk_management module")
-    except ImportError as e:
-        print(f"❌ risk_management: {e}")
-        return False
+    for name, label in BOT_MODULES:
+        if importlib.util.find_spec(name) is None:
+            print(f"❌ {name}: not found")
+            return False
+        print(f"✅ {label}")
     
     return True
 
@@ -2,163 +2,367 @@
 """
 Webhook server for CoinPayments payment confirmations
 Handles payment webhooks and activates user subscriptions
+
+Production: gunicorn webhook_server:app (settings in gunicorn.conf.py)
 """
 
-from flask import Flask, request, jsonify
-import sqlite3
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+import aiosqlite
 import hmac
 import hashlib
 import logging
 import os
+import time
 from datetime import datetime
+from typing import Optional
+from urllib.parse import parse_qsl
 from dotenv import load_dotenv
 
 load_dotenv()
 
-app = Flask(__name__)
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper())
 logger = logging.getLogger(__name__)
 
+DB_PATH = 'crypto_bot.db'
+
+_SQL_UPDATE_PAYMENT = '''
+    UPDATE payments SET payment_status = ?, confirmed_at = ?
+    WHERE transaction_id = ? AND telegram_id = ?
+    RETURNING payment_plan
+'''
+_SQL_ACTIVATE = '''
+    UPDATE users SET is_premium = 1, premium_expires = ?
+    WHERE telegram_id = ?
+'''
+# Premium duration per payment plan, in seconds; unknown plans get one month
+_PLAN_SECONDS = {
+    '1month': 30 * 86400,
+    '3months': 90 * 86400,
+    '1year': 365 * 86400
+}
+_db = None  # process-wide connection, opened on first use
+_db_lock = asyncio.Lock()  # one payment transaction at a time on that connection
+
+async def get_db():
+    """Shared database connection in WAL mode; call with _db_lock held"""
+    global _db
+    if _db is None:
+        conn = await aiosqlite.connect(DB_PATH, isolation_level=None)
+        await conn.executescript(
+            'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL; PRAGMA temp_store=MEMORY;'
+        )
+        await conn.execute(_SQL_PENDING_TABLE)
+        _db = conn
+    return _db
+
+# Confirmed IPNs are written to pending_ipn before they are acknowledged; a
+# background worker applies them in batches and deletes each row in the same
+# transaction, so a crash or failed write leaves the IPN to be retried
+_SQL_PENDING_TABLE = '''
+    CREATE TABLE IF NOT EXISTS pending_ipn (
+        payment_id TEXT NOT NULL,
+        user_id INTEGER NOT NULL,
+        amount_crypto TEXT,
+        currency TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt INTEGER NOT NULL,
+        PRIMARY KEY (payment_id, user_id)
+    )
+'''
+_SQL_STORE_IPN = '''
+    INSERT INTO pending_ipn (payment_id, user_id, amount_crypto, currency, next_attempt)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (payment_id, user_id) DO UPDATE SET next_attempt = excluded.next_attempt
+'''
+_SQL_DUE_IPNS = '''
+    SELECT payment_id, user_id, attempts FROM pending_ipn
+    WHERE next_attempt <= ? ORDER BY next_attempt LIMIT ?
+'''
+_SQL_DUE_IPN = '''
+    SELECT payment_id, user_id, attempts FROM pending_ipn
+    WHERE payment_id = ? AND user_id = ? AND next_attempt <= ?
+'''
+_SQL_DONE_IPN = 'DELETE FROM pending_ipn WHERE payment_id = ? AND user_id = ?'
+_SQL_RETRY_IPN = '''
+    UPDATE pending_ipn SET attempts = attempts + 1, next_attempt = ?
+    WHERE payment_id = ? AND user_id = ?
+'''
+_BATCH_SIZE = 100
+_BATCH_WINDOW = 0.05  # seconds to let a batch fill before committing
+_RETRY_BASE = 5  # seconds before the first retry; doubles per attempt
+_RETRY_MAX = 3600
+_MAX_ATTEMPTS = 20  # roughly 15 hours of retries before an IPN is dropped
+_wake = asyncio.Event()  # set when a new IPN is stored
+_worker = None
+
+def _ensure_worker():
+    """Start the payment worker on the running loop if it isn't running"""
+    global _worker
+    if _worker is None or _worker.done():
+        _worker = asyncio.create_task(_payment_worker())
+
+async def _store_ipn(payment_id, user_id, amount_crypto, currency):
+    """Durably record a confirmed IPN for the worker"""
+    async with _db_lock:
+        conn = await get_db()
+        await conn.execute(_SQL_STORE_IPN, (payment_id, user_id, amount_crypto, currency, int(time.time())))
+    _ensure_worker()
+    _wake.set()
+
+async def _payment_worker():
+    """Apply pending IPNs for the life of the app, sleeping until the next one is due"""
+    while True:
+        _wake.clear()
+        try:
+            delay = await _drain_pending()
+        except Exception as e:
+            logger.error("Pending IPN worker error: %s", e)
+            delay = _RETRY_BASE
+        try:
+            await asyncio.wait_for(_wake.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+        await asyncio.sleep(_BATCH_WINDOW)
+
+async def _drain_pending():
+    """Process every due IPN; seconds until the next retry, or None if none are left"""
+    while True:
+        now = int(time.time())
+        async with _db_lock:
+            conn = await get_db()
+            try:
+                settled = await _settle_in_transaction(conn, _SQL_DUE_IPNS, (now, _BATCH_SIZE), now)
+            except Exception as e:
+                logger.error("Batch update error, settling payments individually: %s", e)
+                settled = await _settle_individually(conn, now)
+        if settled < _BATCH_SIZE:
+            break
+    
+    async with _db_lock:
+        cursor = await conn.execute('SELECT MIN(next_attempt) FROM pending_ipn')
+        (next_attempt,) = await cursor.fetchone()
+        await cursor.close()
+    return None if next_attempt is None else max(0, next_attempt - time.time())
+
+async def _settle_individually(conn, now):
+    """Settle due IPNs one transaction each, so one bad row can't block the rest"""
+    cursor = await conn.execute(_SQL_DUE_IPNS, (now, _BATCH_SIZE))
+    rows = await cursor.fetchall()
+    await cursor.close()
+    for payment_id, user_id, attempts in rows:
+        try:
+            await _settle_in_transaction(conn, _SQL_DUE_IPN, (payment_id, user_id, now), now)
+        except Exception as e:
+            logger.error("Payment update error for %s: %s", payment_id, e)
+            await _retry_or_drop(conn, payment_id, user_id, attempts, now)
+    return len(rows)
+
+async def _settle_in_transaction(conn, select_sql, params, now):
+    """Claim due IPNs and apply each, deleting it or scheduling its retry, atomically
+    
+    The SELECT runs inside the BEGIN IMMEDIATE write transaction, so another
+    server process can't claim and apply the same rows concurrently.
+    """
+    await conn.execute('BEGIN IMMEDIATE')
+    try:
+        cursor = await conn.execute(select_sql, params)
+        rows = await cursor.fetchall()
+        await cursor.close()
+        for payment_id, user_id, attempts in rows:
+            if await _apply_payment(conn, payment_id, user_id, 'confirmed'):
+                await conn.execute(_SQL_DONE_IPN, (payment_id, user_id))
+            else:
+                # Usually the IPN beat the payment row's commit; try again later
+                await _retry_or_drop(conn, payment_id, user_id, attempts, now)
+    except BaseException:
+        await conn.execute('ROLLBACK')
+        raise
+    await conn.execute('COMMIT')
+    return len(rows)
+
+async def _retry_or_drop(conn, payment_id, user_id, attempts, now):
+    """Schedule the next attempt, or give up once _MAX_ATTEMPTS is reached"""
+    if attempts + 1 >= _MAX_ATTEMPTS:
+        logger.error("Dropping IPN %s for user %s after %d attempts", payment_id, user_id, attempts + 1)
+        await conn.execute(_SQL_DONE_IPN, (payment_id, user_id))
+    else:
+        await conn.execute(_SQL_RETRY_IPN, (now + _retry_delay(attempts), payment_id, user_id))
+
+def _retry_delay(attempts):
+    """Exponential backoff, capped at _RETRY_MAX seconds"""
+    return min(_RETRY_BASE << min(attempts, 20), _RETRY_MAX)
+
+@asynccontextmanager
+async def lifespan(app):
+    # Pick up IPNs left pending by a previous run
+    _ensure_worker()
+    yield
+    global _db, _worker
+    if _worker is not None:
+        # Stop between transactions; anything unapplied stays in pending_ipn
+        async with _db_lock:
+            _worker.cancel()
+        _worker = None
+    if _db is not None:
+        await _db.close()
+        _db = None
+
+app = FastAPI(lifespan=lifespan)
+
 # CoinPayments IPN Secret
 COINPAYMENTS_IPN_SECRET = os.getenv('COINPAYMENTS_IPN_SECRET')
+_IPN_SECRET_BYTES = COINPAYMENTS_IPN_SECRET.encode('utf-8') if COINPAYMENTS_IPN_SECRET else b''
 
-def verify_coinpayments_ipn(form_data, secret):
-    """Verify CoinPayments IPN signature"""
+def verify_coinpayments_ipn(body: bytes, signature: Optional[str]) -> bool:
+    """Verify CoinPayments IPN signature
+    
+    CoinPayments sends the HMAC-SHA512 of the raw POST body, keyed with the
+    IPN secret, in the HMAC header.
+    """
     try:
-        # Get the merchant's signature from form data
-        merchant_signature = form_data.get('merchant')
-        
-        # Create the expected signature using HMAC-SHA512
-        expected_signature = hmac.new(
-            secret.encode('utf-8'),
-            str(form_data).encode('utf-8'),
-            hashlib.sha512
-        ).hexdigest()
-        
-        return merchant_signature == expected_signature
+        expected_signature = hmac.new(_IPN_SECRET_BYTES, body, hashlib.sha512).hexdigest()
+        return hmac.compare_digest(signature or '', expected_signature)
         
     except Exception as e:
-        logger.error(f"IPN verification error: {e}")
+        logger.error("IPN verification error: %s", e)
         return False
 
-def update_payment_status(payment_id, user_id, status, amount_crypto, currency):
+async def update_payment_status(payment_id: str, user_id: int, status: str,
+                                amount_crypto: str, currency: str) -> bool:
     """Update payment status and activate user"""
     try:
-        conn = sqlite3.connect('crypto_bot.db')
-        cursor = conn.cursor()
-        
-        # Update payment status
-        cursor.execute('''
-            UPDATE payments SET payment_status = ?, confirmed_at = ?
-            WHERE transaction_id = ? AND telegram_id = ?
-        ''', (status, datetime.now(), payment_id, user_id))
-        
-        if cursor.rowcount == 0:
-            logger.warning(f"Payment not found: {payment_id}")
-            return False
-        
-        # Get payment plan
-        cursor.execute('''
-            SELECT payment_plan FROM payments WHERE transaction_id = ?
-        ''', (payment_id,))
-        payment_plan = cursor.fetchone()
-        
-        if payment_plan:
-            plan_id = payment_plan[0]
-            
-            # Set premium duration based on plan
-            plan_durations = {
-                '1month': 30,
-                '3months': 90,
-                '1year': 365
-            }
-            
-            duration_days = plan_durations.get(plan_id, 30)
-            expires_at = datetime.now().timestamp() + (duration_days * 24 * 60 * 60)
-            
-            # Activate premium access
-            cursor.execute('''
-                UPDATE users SET is_premium = 1, premium_expires = ?
-                WHERE telegram_id = ?
-            ''', (expires_at, user_id))
-            
-            logger.info(f"Activated premium for user {user_id} until {datetime.fromtimestamp(expires_at)}")
-        
-        conn.commit()
-        conn.close()
-        return True
+        async with _db_lock:
+            conn = await get_db()
+            await conn.execute('BEGIN IMMEDIATE')
+            try:
+                activated = await _apply_payment(conn, payment_id, user_id, status)
+            except BaseException:
+                await conn.execute('ROLLBACK')
+                raise
+            await conn.execute('COMMIT' if activated else 'ROLLBACK')
+            return activated
         
     except Exception as e:
-        logger.error(f"Database update error: {e}")
+        logger.error("Database update error: %s", e)
+        return False
+
+async def _apply_payment(conn, payment_id: str, user_id: int, status: str) -> bool:
+    """Payment and premium updates, run inside the caller's transaction"""
+    # One clock read: confirmed_at keeps the datetime the bots also write there,
+    # premium_expires is INTEGER epoch seconds
+    now = datetime.now()
+    now_ts = int(now.timestamp())
+    
+    # Update payment status; RETURNING hands back the plan in the same statement
+    cursor = await conn.execute(_SQL_UPDATE_PAYMENT, (status, now, payment_id, user_id))
+    payment_plan = await cursor.fetchone()
+    await cursor.close()
+    
+    if payment_plan is None:
+        logger.warning("Payment not found: %s", payment_id)
         return False
+    
+    # Activate premium access for the plan's duration
+    expires_at = now_ts + _PLAN_SECONDS.get(payment_plan[0], _PLAN_SECONDS['1month'])
+    await conn.execute(_SQL_ACTIVATE, (expires_at, user_id))
+    
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Activated premium for user %s until %s", user_id, datetime.fromtimestamp(expires_at))
+    
+    return True
+
+async def _on_confirmed(status, payment_id, user_id, amount_crypto, currency):
+    """Status 100: payment confirmed, queue premium activation"""
+    if not COINPAYMENTS_IPN_SECRET:
+        # Unverified confirmations would let anyone activate premium
+        logger.error("Rejecting payment confirmation for user %s: no IPN secret configured", user_id)
+        return JSONResponse({"error": "IPN secret not configured"}, status_code=403)
+    
+    try:
+        await _store_ipn(payment_id, user_id, amount_crypto, currency)
+    except Exception as e:
+        # Not acknowledged, so CoinPayments will resend it
+        logger.error("Failed to store payment for user %s: %s", user_id, e)
+        return JSONResponse({"error": "Update failed"}, status_code=500)
+    
+    logger.info("Payment queued for user %s: %s", user_id, payment_id)
+    return JSONResponse({"status": "queued"}, status_code=200)
+
+async def _on_pending(status, payment_id, user_id, amount_crypto, currency):
+    """Status 0: payment pending"""
+    logger.info("Payment pending for user %s: %s", user_id, payment_id)
+    return JSONResponse({"status": "pending"}, status_code=200)
+
+async def _on_other_status(status, payment_id, user_id, amount_crypto, currency):
+    """Any other status is acknowledged without changes"""
+    logger.info("Payment status %s for user %s: %s", status, user_id, payment_id)
+    return JSONResponse({"status": "unknown"}, status_code=200)
 
-@app.route('/webhook/coinpayments', methods=['POST'])
-def coinpayments_webhook():
+# CoinPayments IPN status code -> handler; add entries here for new statuses
+_STATUS_HANDLERS = {
+    100: _on_confirmed,
+    0: _on_pending,
+}
+
+def _parse_ipn(form):
+    """(payment_id, user_id, status, amount, currency) from IPN fields, or None if invalid"""
+    try:
+        parsed = (form['payment_id'], int(form['ipn_data']), int(form.get('status', 0)),
+                  form.get('amount1', '0'), form.get('currency1', 'USD'))
+    except (KeyError, ValueError):
+        return None
+    return parsed if parsed[0] and parsed[1] else None
+
+@app.post('/webhook/coinpayments')
+async def coinpayments_webhook(request: Request):
     """Handle CoinPayments webhook for payment confirmations"""
     try:
-        # Get form data from CoinPayments
-        form_data = request.form.to_dict()
-        
-        logger.info(f"Received CoinPayments webhook: {form_data}")
+        # Get the raw body; the signature covers these exact bytes
+        body = await request.body()
         
         # Verify IPN signature
         if COINPAYMENTS_IPN_SECRET:
-            if not verify_coinpayments_ipn(form_data, COINPAYMENTS_IPN_SECRET):
+            if not verify_coinpayments_ipn(body, request.headers.get('HMAC')):
                 logger.warning("Invalid IPN signature - rejecting webhook")
-                return jsonify({"error": "Invalid signature"}), 400
+                return JSONResponse({"error": "Invalid signature"}, status_code=400)
         else:
             logger.warning("No IPN secret configured - webhook not verified")
         
-        # Extract payment information
-        payment_id = form_data.get('payment_id')
-        user_id = int(form_data.get('ipn_data', 0))
-        status = int(form_data.get('status', 0))
-        amount_crypto = form_data.get('amount1', '0')
-        currency = form_data.get('currency1', 'USD')
-        
-        if not payment_id or not user_id:
-            logger.error("Missing payment_id or user_id in webhook")
-            return jsonify({"error": "Missing required fields"}), 400
-        
-        # Check payment status
-        if status == 100:  # Payment confirmed
-            success = update_payment_status(
-                payment_id=payment_id,
-                user_id=user_id,
-                status='confirmed',
-                amount_crypto=amount_crypto,
-                currency=currency
-            )
-            
-            if success:
-                logger.info(f"Payment confirmed for user {user_id}: {payment_id}")
-                return jsonify({"status": "confirmed"}), 200
-            else:
-                logger.error(f"Failed to update payment for user {user_id}")
-                return jsonify({"error": "Update failed"}), 500
+        # Parse the form fields only once the payload is trusted
+        form_data = dict(parse_qsl(body.decode(), keep_blank_values=True))
+        logger.info("Received CoinPayments webhook: %r", form_data)
         
-        elif status == 0:  # Payment pending
-            logger.info(f"Payment pending for user {user_id}: {payment_id}")
-            return jsonify({"status": "pending"}), 200
+        # Extract payment information
+        parsed = _parse_ipn(form_data)
+        if parsed is None:
+            logger.error("Missing or malformed payment_id/user_id/status in webhook")
+            return JSONResponse({"error": "Missing required fields"}, status_code=400)
+        payment_id, user_id, status, amount_crypto, currency = parsed
         
-        else:
-            logger.info(f"Payment status {status} for user {user_id}: {payment_id}")
-            return jsonify({"status": "unknown"}), 200
+        # Dispatch on payment status
+        handler = _STATUS_HANDLERS.get(status, _on_other_status)
+        return await handler(status, payment_id, user_id, amount_crypto, currency)
         
     except Exception as e:
-        logger.error(f"Webhook processing error: {e}")
-        return jsonify({"error": "Server error"}), 500
+        logger.error("Webhook processing error: %s", e)
+        return JSONResponse({"error": "Server error"}, status_code=500)
 
-@app.route('/webhook/test', methods=['GET'])
-def test_webhook():
+@app.get('/webhook/test')
+async def test_webhook():
     """Test webhook endpoint"""
-    return jsonify({"status": "Webhook server is running", "timestamp": datetime.now().isoformat()})
+    return {"status": "Webhook server is running", "timestamp": datetime.now().isoformat()}
 
-@app.route('/health', methods=['GET'])
-def health_check():
+@app.get('/health')
+async def health_check():
     """Health check endpoint"""
-    return jsonify({"status": "healthy", "service": "crypto-payment-webhook"})
+    return {"status": "healthy", "service": "crypto-payment-webhook"}
 
 if __name__ == '__main__':
+    # Single-process server for local runs; deploy with gunicorn for multiple workers
+    import uvicorn
+    
     port = int(os.environ.get('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=False)
+    uvicorn.run(app, host='0.0.0.0', port=port)